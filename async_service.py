@@ -0,0 +1,139 @@
+# async_service.py
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+from config import ASYNC_MAX_WORKERS
+
+
+class AsyncTencentAIService:
+    """
+    TencentAIService 的异步版本：所有请求运行在同一个后台事件循环上，
+    阻塞的 SDK 调用交给有界线程池执行，避免每次点击都创建新线程。
+    通过 submit() 按 key 提交任务时，同一 key 的新请求会取消尚未完成的旧请求（latest-wins）。
+    """
+
+    def __init__(self, service, max_workers=ASYNC_MAX_WORKERS):
+        """
+        :param service: 同步的 TencentAIService 实例
+        :param max_workers: 执行阻塞调用的线程数上限
+        """
+        self.service = service
+        self.loop = asyncio.new_event_loop()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-worker")
+        self.loop.set_default_executor(self._executor)
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="ai-event-loop", daemon=True)
+        self._thread.start()
+
+    async def run_blocking(self, func, *args):
+        """
+        在线程池中执行阻塞函数（如 SDK 调用、数据库查询）并等待结果。
+        """
+        return await self.loop.run_in_executor(None, functools.partial(func, *args))
+
+    async def ocr_image(self, image_path, raw=None, decoded=None):
+        return await self.run_blocking(self.service.ocr_image, image_path, raw, decoded)
+
+    async def translate_text(self, text, target_lang, source_lang='auto'):
+        return await self.run_blocking(self.service.translate_text, text, target_lang, source_lang)
+
+    async def translate_segmented(self, text, target_lang, source_lang='auto'):
+        return await self.run_blocking(self.service.translate_segmented, text, target_lang, source_lang)
+
+    async def translate_incremental(self, text, target_lang, previous=None, source_lang='auto'):
+        return await self.run_blocking(self.service.translate_incremental, text, target_lang, previous, source_lang)
+
+    async def text_to_speech(self, text, voice_type):
+        return await self.run_blocking(self.service.text_to_speech, text, voice_type)
+
+    async def text_to_speech_chunks(self, text, voice_type, as_bytes=False):
+        """
+        异步迭代长文本语音合成的各分片路径（as_bytes 为 True 时为音频数据）；
+        迭代被取消时会关闭底层生成器，停止尚未开始的分片。
+        """
+        async for chunk in self._iterate(self.service.text_to_speech_chunks(text, voice_type, as_bytes)):
+            yield chunk
+
+    async def detect_language(self, text):
+        return await self.run_blocking(self.service.detect_language, text)
+
+    async def translate_fanout(self, text, target_langs, source_lang='auto'):
+        """
+        异步迭代多目标语言翻译的结果，按完成顺序产出 (目标语言代码, 译文)。
+        """
+        async for item in self._iterate(self.service.translate_fanout(text, target_langs, source_lang)):
+            yield item
+
+    async def _iterate(self, chunks):
+        """
+        在线程池中逐步推进同步生成器；迭代被取消时会关闭该生成器。
+        """
+        pending = None
+        try:
+            while True:
+                pending = self._executor.submit(next, chunks, StopIteration)
+                item = await asyncio.wrap_future(pending)
+                if item is StopIteration:
+                    return
+                yield item
+        finally:
+            # 生成器可能仍在工作线程中执行，等当前这一步结束后再关闭，避免并发操作同一生成器
+            if pending is not None:
+                pending.add_done_callback(lambda _: chunks.close())
+
+    def submit(self, key, coro, callback=None):
+        """
+        线程安全地提交协程到后台事件循环。
+        :param key: 任务标识（如对应的界面控件），同一 key 的旧任务会被取消
+        :param coro: 待执行的协程对象
+        :param callback: 完成回调 callback(result, error)，在事件循环线程中调用；任务被取消时不调用
+        :return: concurrent.futures.Future
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        with self._lock:
+            previous = self._tasks.get(key)
+            self._tasks[key] = future
+        if previous is not None:
+            previous.cancel()
+
+        def on_done(done):
+            with self._lock:
+                latest = self._tasks.get(key) is done
+                if latest:
+                    del self._tasks[key]
+            # 已被同 key 的新请求取代（或被取消）的任务，即使执行完成也丢弃其结果
+            if not latest or done.cancelled() or callback is None:
+                return
+            try:
+                result, error = done.result(), None
+            except CancelledError:
+                return
+            except Exception as e:
+                result, error = None, e
+            callback(result, error)
+
+        future.add_done_callback(on_done)
+        return future
+
+    def cancel(self, key):
+        """
+        取消指定 key 尚未完成的任务。
+        """
+        with self._lock:
+            future = self._tasks.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def shutdown(self):
+        """
+        取消所有任务并停止事件循环和线程池，程序退出时调用。
+        """
+        with self._lock:
+            futures, self._tasks = list(self._tasks.values()), {}
+        for future in futures:
+            future.cancel()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=2)
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,251 @@
+# audio_cache.py
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from config import TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, TTS_CACHE_MEMORY_BYTES
+
+
+class AudioCache:
+    """
+    TTS 音频缓存：磁盘层 + 可选的内存层。
+    - 磁盘层：音频保存在独立的缓存目录中，先写临时文件再原子重命名，并发写入也不会留下半截文件；
+      目录内的 index.json 记录每个文件的大小和最近访问时间，总大小超出字节预算时按 LRU 淘汰；
+    - 内存层：按字节预算保存最近使用的音频数据，热点音频无需读盘。
+    """
+
+    INDEX_FILE = "index.json"
+    # 访问时间变化后最多间隔多久落盘一次索引（秒）
+    INDEX_SAVE_INTERVAL = 30
+    # 超过该时长（秒）未修改的临时文件才视为中断写入的遗留，正在写入中的临时文件不受影响
+    STALE_TMP_AGE = 600
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES, memory_bytes=TTS_CACHE_MEMORY_BYTES):
+        """
+        :param directory: 缓存目录
+        :param max_bytes: 磁盘缓存的字节预算
+        :param memory_bytes: 内存层的字节预算，为 0 时不启用内存层
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # key -> {'size': 字节数, 'atime': 最近访问时间}，按访问先后排序
+        self._memory = OrderedDict()  # key -> bytes
+        self._memory_size = 0
+        self._dirty = False
+        self._last_save = 0.0
+        self._stats = {'hits': 0, 'memory_hits': 0, 'misses': 0, 'evictions': 0, 'writes': 0}
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"tts_{key}.mp3")
+
+    def _load_index(self):
+        """
+        加载磁盘索引；索引缺失或损坏时扫描目录重建，并清理中断写入遗留的临时文件。
+        多个进程共用缓存目录时，其他进程可能正在写入临时文件，因此只删除 STALE_TMP_AGE 秒前的临时文件。
+        只有扫描发现索引与目录不一致（或发生淘汰）时才重写索引文件。
+        """
+        entries = {}
+        changed = False
+        try:
+            with open(os.path.join(self.directory, self.INDEX_FILE), "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            changed = True
+        stale_before = time.time() - self.STALE_TMP_AGE
+        files = set()
+        for name in os.listdir(self.directory):
+            full_path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                try:
+                    if os.path.getmtime(full_path) < stale_before:
+                        os.remove(full_path)
+                except OSError:
+                    pass
+            elif name.startswith("tts_") and name.endswith(".mp3"):
+                key = name[4:-4]
+                files.add(key)
+                if key not in entries:
+                    stat = os.stat(full_path)
+                    entries[key] = {'size': stat.st_size, 'atime': stat.st_mtime}
+                    changed = True
+        # 丢弃文件已不存在的索引项（按目录列表判断，无需逐个 stat），并按访问时间排序
+        valid = [(k, v) for k, v in entries.items() if k in files]
+        changed = changed or len(valid) != len(entries)
+        self._index = OrderedDict(sorted(valid, key=lambda item: item[1]['atime']))
+        if self._evict() or changed:
+            self._save_index()
+
+    def _save_index(self):
+        """
+        原子写入索引文件（调用方需持有锁或处于初始化阶段）。
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, os.path.join(self.directory, self.INDEX_FILE))
+        except OSError as e:
+            print(f"TTS Cache Index Error: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def _touch(self, key):
+        self._index[key]['atime'] = time.time()
+        self._index.move_to_end(key)
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        """
+        标记索引需要落盘，距上次保存超过 INDEX_SAVE_INTERVAL 秒时才实际写入（调用方需持有锁）。
+        进程异常退出时未落盘的新条目会在下次加载索引扫描目录时补回。
+        """
+        self._dirty = True
+        if time.monotonic() - self._last_save > self.INDEX_SAVE_INTERVAL:
+            self._save_index()
+
+    def get_path(self, key):
+        """
+        查询磁盘缓存。
+        :param key: 缓存键（如文本与音色的 MD5）
+        :return: 命中时返回音频文件路径，否则返回 None。
+        """
+        path = self.path_for(key)
+        with self._lock:
+            if key in self._index and os.path.exists(path):
+                self._touch(key)
+                self._stats['hits'] += 1
+                return path
+            self._index.pop(key, None)
+            self._stats['misses'] += 1
+            return None
+
+    def get_bytes(self, key):
+        """
+        读取缓存的音频数据：优先从内存层读取，否则读盘并放入内存层。
+        :return: 音频字节数据，未命中返回 None。
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                if key in self._index:
+                    self._touch(key)
+                self._stats['memory_hits'] += 1
+                return data
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        with self._lock:
+            self._remember(key, data)
+        return data
+
+    def put(self, key, data):
+        """
+        写入音频：先写入同目录下的临时文件，再原子重命名为最终文件名，随后按字节预算淘汰旧文件。
+        索引按节流间隔落盘，发生淘汰时立即落盘。
+        :param key: 缓存键
+        :param data: 音频字节数据
+        :return: 音频文件路径
+        """
+        path = self.path_for(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            # 重命名与索引更新在同一把锁内完成，保证索引中的大小与最终落盘的文件一致
+            os.replace(tmp_path, path)
+            self._index[key] = {'size': len(data), 'atime': time.time()}
+            self._index.move_to_end(key)
+            self._stats['writes'] += 1
+            self._remember(key, data)
+            if self._evict(keep=key):
+                self._save_index()
+            else:
+                self._mark_dirty()
+        return path
+
+    def _remember(self, key, data):
+        """
+        放入内存层，超出字节预算时淘汰最久未使用的条目（调用方需持有锁）。
+        """
+        if not self.memory_bytes or len(data) > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_size -= len(old)
+
+    def _evict(self, keep=None):
+        """
+        按 LRU 顺序删除磁盘文件，直到总大小不超过字节预算（调用方需持有锁或处于初始化阶段）。
+        :param keep: 不参与淘汰的键（刚写入的文件）
+        :return: 淘汰的文件数
+        """
+        evicted = 0
+        total = sum(entry['size'] for entry in self._index.values())
+        for key in list(self._index):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._index.pop(key)['size']
+            if key in self._memory:
+                self._memory_size -= len(self._memory.pop(key))
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+            self._stats['evictions'] += 1
+            evicted += 1
+        return evicted
+
+    def flush(self):
+        """
+        将尚未落盘的访问时间写入索引，程序退出时调用。
+        """
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def close(self):
+        """
+        程序退出时调用：写入尚未落盘的索引。
+        """
+        self.flush()
+
+    def stats(self):
+        """
+        获取缓存统计。
+        :return: 包含命中、内存命中、未命中、淘汰、写入次数及当前占用字节数的字典
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['entries'] = len(self._index)
+            snapshot['disk_bytes'] = sum(entry['size'] for entry in self._index.values())
+            snapshot['memory_bytes'] = self._memory_size
+        return snapshot
@@ -0,0 +1,303 @@
+# batch.py
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import LANG_MAP, METRICS_EXPORT_PATH
+from metrics import metrics
+
+# 批处理支持的图片扩展名（与界面上传对话框一致，额外支持 .jpeg）
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+# 接口错误结果的前缀，出现时视为该阶段失败
+ERROR_PREFIXES = ("OCR Error:", "Translate Error:")
+
+
+def collect_images(source):
+    """
+    收集待处理的图片路径。
+    :param source: 图片目录（递归遍历）或清单文件（每行一个路径，或 .jsonl 中每行含 "path" 字段）
+    :return: 按名称排序的图片绝对路径列表
+    """
+    if os.path.isdir(source):
+        images = []
+        for dir_path, _, file_names in os.walk(source):
+            for name in file_names:
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    images.append(os.path.abspath(os.path.join(dir_path, name)))
+        return sorted(images)
+
+    # 清单中的相对路径以清单文件所在目录为基准
+    base_dir = os.path.dirname(os.path.abspath(source))
+    images = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"): continue
+            path = json.loads(line)["path"] if source.endswith(".jsonl") else line
+            images.append(os.path.abspath(os.path.join(base_dir, path)))
+    return images
+
+
+class Checkpoint:
+    """
+    断点续跑记录：以 JSONL 追加写入已完成的图片，重新运行时跳过这些图片。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.done.add(json.loads(line)["path"])
+                    except (ValueError, KeyError):
+                        # 崩溃时可能留下写了一半的最后一行，忽略即可
+                        continue
+        self._file = open(path, "a", encoding="utf-8")
+
+    def is_done(self, image_path):
+        return image_path in self.done
+
+    def record(self, entries):
+        """
+        追加写入已完成的图片并立即落盘。
+        :param entries: 结果字典列表，需包含 path 字段
+        """
+        with self._lock:
+            for entry in entries:
+                self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self.done.add(entry["path"])
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def percentile(values, pct):
+    """
+    计算百分位数（最近秩法）。
+    """
+    if not values: return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class BatchPipeline:
+    """
+    无界面批处理流水线：OCR -> 翻译 -> 可选 TTS -> 批量写入历史记录。
+    图片由有界线程池并发处理；历史记录攒够一批后通过 add_history_batch 一次写入，
+    写入成功后才记录断点，保证续跑时不会漏写历史。
+    """
+
+    def __init__(self, ai_service, db=None, user_id=None, target_lang='en', voice_type=None, workers=4,
+                 history_batch_size=50, checkpoint=None):
+        """
+        :param ai_service: TencentAIService 实例
+        :param db: DatabaseManager 实例，为 None 时不写历史记录
+        :param user_id: 历史记录关联的用户 ID
+        :param target_lang: 目标语言代码
+        :param voice_type: 音色 ID，为 None 时跳过语音合成
+        :param workers: 并发处理的图片数
+        :param history_batch_size: 每批写入的历史记录条数
+        :param checkpoint: Checkpoint 实例，为 None 时不支持续跑
+        """
+        self.ai_service = ai_service
+        self.db = db
+        self.user_id = user_id
+        self.target_lang = target_lang
+        self.voice_type = voice_type
+        self.workers = workers
+        self.history_batch_size = history_batch_size
+        self.checkpoint = checkpoint
+        self._lock = threading.Lock()
+        self._pending = []  # (历史记录行, 断点条目)
+        self.latencies = {'ocr': [], 'translate': [], 'tts': [], 'history': []}
+        # 各阶段失败的图片数；'system' 为处理过程中抛出异常（而不是返回错误提示）的图片数
+        self.failures = {'ocr': 0, 'translate': 0, 'tts': 0, 'history': 0, 'system': 0}
+
+    def _timed(self, stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        with self._lock:
+            self.latencies[stage].append(time.perf_counter() - start)
+        return result
+
+    def _fail(self, stage):
+        with self._lock:
+            self.failures[stage] += 1
+
+    def process(self, image_path):
+        """
+        处理单张图片。
+        :return: 结果字典；任一阶段失败时返回 None（该图片不会记入断点，下次运行会重试）
+        """
+        text = self._timed('ocr', self.ai_service.ocr_image, image_path)
+        if text.startswith(ERROR_PREFIXES):
+            print(f"{image_path}: {text}")
+            self._fail('ocr')
+            return None
+        translated = ""
+        if text.strip():
+            translated = self._timed('translate', self.ai_service.translate_segmented, text, self.target_lang)
+            if translated.startswith(ERROR_PREFIXES):
+                print(f"{image_path}: {translated}")
+                self._fail('translate')
+                return None
+        entry = {'path': image_path, 'original': text, 'translated': translated}
+        if self.voice_type is not None and translated.strip():
+            audio = self._timed('tts', lambda: list(self.ai_service.text_to_speech_chunks(translated, self.voice_type)))
+            if not audio or None in audio:
+                self._fail('tts')
+                return None
+            entry['audio'] = audio
+        return entry
+
+    def _complete(self, entry):
+        """
+        登记完成的图片；无需写历史时直接记录断点，否则攒批写入。
+        """
+        if self.db is None:
+            if self.checkpoint: self.checkpoint.record([entry])
+            return
+        row = (self.user_id, entry['original'], entry['translated'], self.target_lang)
+        with self._lock:
+            self._pending.append((row, entry))
+            ready = len(self._pending) >= self.history_batch_size
+        if ready:
+            self.flush_history()
+
+    def flush_history(self):
+        """
+        将攒下的历史记录一次性写入数据库，成功后再记录断点。
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending: return
+        ok = self._timed('history', self.db.add_history_batch, [row for row, _ in pending])
+        if not ok:
+            with self._lock:
+                self.failures['history'] += len(pending)
+            return
+        if self.checkpoint: self.checkpoint.record([entry for _, entry in pending])
+
+    def run(self, images):
+        """
+        执行批处理。
+        :param images: 图片路径列表
+        :return: 运行报告字典
+        """
+        todo = [p for p in images if not (self.checkpoint and self.checkpoint.is_done(p))]
+        skipped = len(images) - len(todo)
+        succeeded = 0
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.process, path): path for path in todo}
+            for future in as_completed(futures):
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    print(f"{futures[future]}: System Error: {e}")
+                    self._fail('system')
+                    entry = None
+                if entry is not None:
+                    succeeded += 1
+                    self._complete(entry)
+        if self.db is not None:
+            self.flush_history()
+        elapsed = time.perf_counter() - start
+
+        return {
+            'total': len(images),
+            'skipped': skipped,
+            'processed': len(todo),
+            'succeeded': succeeded,
+            'elapsed_s': elapsed,
+            'throughput_images_per_s': len(todo) / elapsed if elapsed > 0 else 0.0,
+            'failures': dict(self.failures),
+            'latency_ms': {
+                stage: {
+                    'count': len(values),
+                    'avg': sum(values) / len(values) * 1000 if values else 0.0,
+                    'p50': percentile(values, 50) * 1000,
+                    'p95': percentile(values, 95) * 1000,
+                    'p99': percentile(values, 99) * 1000,
+                }
+                for stage, values in self.latencies.items()
+            },
+        }
+
+
+def print_report(report):
+    print(f"Images: {report['total']} total, {report['skipped']} skipped (checkpoint), "
+          f"{report['processed']} processed, {report['succeeded']} succeeded")
+    print(f"Elapsed: {report['elapsed_s']:.2f}s, throughput: {report['throughput_images_per_s']:.2f} images/s")
+    for stage, stats in report['latency_ms'].items():
+        if stats['count']:
+            print(f"  {stage:<10} n={stats['count']:<5} avg={stats['avg']:.1f}ms "
+                  f"p50={stats['p50']:.1f}ms p95={stats['p95']:.1f}ms p99={stats['p99']:.1f}ms")
+    print("Failures: " + ", ".join(f"{stage}={count}" for stage, count in report['failures'].items()))
+    memory = report.get('translation_memory')
+    if memory:
+        print(f"Translation memory: hit rate {memory['hit_rate']:.1%}, {memory['translations_avoided']} translations "
+              f"({memory['chars_avoided']} chars) served without calling the API")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量处理图片：OCR 识别 -> 翻译 -> 可选语音合成 -> 写入历史记录")
+    parser.add_argument("source", help="图片目录或清单文件（.txt 每行一个路径，.jsonl 每行含 path 字段）")
+    parser.add_argument("--target", default="en", choices=sorted(LANG_MAP.values()), help="目标语言代码")
+    parser.add_argument("--user-id", type=int, help="历史记录关联的用户 ID")
+    parser.add_argument("--no-history", action="store_true", help="不写入历史记录（无需数据库）")
+    parser.add_argument("--voice", type=int, help="指定音色 ID 时为译文合成语音")
+    parser.add_argument("--workers", type=int, default=4, help="并发处理的图片数")
+    parser.add_argument("--history-batch", type=int, default=50, help="每批写入的历史记录条数")
+    parser.add_argument("--checkpoint", default="batch_checkpoint.jsonl", help="断点文件路径")
+    parser.add_argument("--json", action="store_true", help="以 JSON 格式输出运行报告")
+    args = parser.parse_args(argv)
+    if not args.no_history and args.user_id is None:
+        parser.error("--user-id is required unless --no-history is given")
+
+    # 延迟导入，仅在真正运行时加载 SDK 和数据库驱动
+    from tencent_ai import TencentAIService
+    from translation_cache import TranslationCache
+    from translation_memory import TranslationMemory
+
+    db = None
+    if not args.no_history:
+        from database import DatabaseManager
+        db = DatabaseManager()
+    memory = None
+    if db is not None:
+        # 以该用户的历史译文作为翻译记忆，重复或仅数字不同的文本无需再次调用翻译接口
+        memory = TranslationMemory()
+        memory.load_history(db, args.user_id)
+    ai_service = TencentAIService(cache=TranslationCache(store=db), memory=memory)
+    checkpoint = Checkpoint(args.checkpoint)
+    try:
+        pipeline = BatchPipeline(ai_service, db=db, user_id=args.user_id, target_lang=args.target,
+                                 voice_type=args.voice, workers=args.workers,
+                                 history_batch_size=args.history_batch, checkpoint=checkpoint)
+        report = pipeline.run(collect_images(args.source))
+    finally:
+        checkpoint.close()
+        if db is not None: db.close()
+    report['translation_memory'] = ai_service.memory_stats()
+    report['metrics'] = metrics.snapshot()
+    if METRICS_EXPORT_PATH:
+        metrics.export(METRICS_EXPORT_PATH)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
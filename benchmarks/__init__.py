@@ -0,0 +1,3 @@
+# benchmarks
+# 离线基准测试：本地模拟腾讯云 OCR/TMT/TTS 接口 + SQLite 代替 MySQL，无需联网、不消耗接口额度。
+# 在项目根目录运行：python -m benchmarks.run --help
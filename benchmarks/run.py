@@ -0,0 +1,239 @@
+# benchmarks/run.py
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.stub_server import StubProfile, StubTencentServer
+
+# 用于生成历史记录的词表，检索基准从中取词
+WORDS = ["翻译", "图片", "识别", "语音", "历史", "记录", "文本", "助手", "hello", "world", "cloud", "speech",
+         "記録", "翻訳", "번역", "기록"]
+
+
+def configure_environment(endpoint):
+    """
+    将腾讯云接入域名指向本地模拟服务，并关闭依赖 MySQL 专有语法的后台归档。
+    必须在导入项目模块（config）之前调用。
+    """
+    os.environ['TENCENT_SECRET_ID'] = "bench"
+    os.environ['TENCENT_SECRET_KEY'] = "bench"
+    os.environ['TENCENT_HTTP_SCHEME'] = "http"
+    for name in ("TENCENT_OCR_ENDPOINT", "TENCENT_TMT_ENDPOINT", "TENCENT_TTS_ENDPOINT"):
+        os.environ[name] = endpoint
+    os.environ['HISTORY_RETENTION_DAYS'] = "0"
+
+
+def summarize(values, elapsed=None):
+    """
+    汇总一组耗时（秒）：次数、平均值与 p50/p95/p99（毫秒），给出 elapsed 时附带吞吐量（次/秒）。
+    """
+    from batch import percentile
+    summary = {
+        'count': len(values),
+        'avg_ms': sum(values) / len(values) * 1000 if values else 0.0,
+        'p50_ms': percentile(values, 50) * 1000,
+        'p95_ms': percentile(values, 95) * 1000,
+        'p99_ms': percentile(values, 99) * 1000,
+    }
+    if elapsed is not None:
+        summary['throughput_per_s'] = len(values) / elapsed if elapsed > 0 else 0.0
+    return summary
+
+
+def timed(samples, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    samples.append(time.perf_counter() - start)
+    return result
+
+
+def make_images(directory, count, size=(1200, 900)):
+    """
+    生成内容互不相同的测试图片，避免命中 OCR 结果缓存。
+    """
+    from PIL import Image, ImageDraw
+    paths = []
+    for i in range(count):
+        image = Image.new("RGB", size, "white")
+        draw = ImageDraw.Draw(image)
+        for line in range(12):
+            draw.text((40, 40 + line * 60), f"image {i} line {line} {random.random():.8f}", fill="black")
+        path = os.path.join(directory, f"bench_{i:05d}.png")
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+def bench_pipeline(args, work_dir, server):
+    """
+    OCR -> 翻译 -> TTS -> 写入历史 的完整流水线基准（复用 batch.py 的 BatchPipeline）。
+    """
+    from audio_cache import AudioCache
+    from batch import BatchPipeline
+    from rate_limit import TokenBucket
+    from tencent_ai import TencentAIService
+    from translation_cache import TranslationCache
+    from benchmarks.sqlite_db import SqliteDatabaseManager
+
+    class TimedPipeline(BatchPipeline):
+        # 额外记录每张图片的端到端耗时
+        def process(self, image_path):
+            return self._timed('pipeline', super().process, image_path)
+
+    images = make_images(work_dir, args.images)
+    db = SqliteDatabaseManager(os.path.join(work_dir, "pipeline.db"))
+    ai_service = TencentAIService(cache=TranslationCache(), audio_cache=AudioCache(os.path.join(work_dir, "tts")))
+    if args.unlimited:
+        ai_service.limiters = {service: TokenBucket(1e6) for service in ai_service.limiters}
+    try:
+        db.register_user("bench", "bench")
+        user_id = db.login_user("bench", "bench")
+        pipeline = TimedPipeline(ai_service, db=db, user_id=user_id, target_lang=args.target,
+                                 voice_type=args.voice, workers=args.workers)
+        pipeline.latencies['pipeline'] = []
+        report = pipeline.run(images)
+    finally:
+        db.close()
+    report['stub'] = server.stats()
+    report['limiters'] = ai_service.limiter_stats()
+    return report
+
+
+def seed_history(db, start_id, count, users, base_time):
+    """
+    按时间顺序插入 count 条历史记录，轮流分配给 users 个用户（基准用户为 1 号）。
+    :return: 每批插入耗时列表（秒）
+    """
+    samples = []
+    rows = []
+    for i in range(start_id, start_id + count):
+        words = random.sample(WORDS, 6)
+        created_at = (base_time + datetime.timedelta(seconds=i * 30)).strftime("%Y-%m-%d %H:%M:%S")
+        original, translated = " ".join(words) * 4, " ".join(reversed(words)) * 4
+        rows.append((*db._history_row(i % users + 1, original, translated, "en"), created_at))
+    for offset in range(0, len(rows), 1000):
+        conn = db.get_connection()
+        cursor = conn.cursor()
+        start = time.perf_counter()
+        cursor.executemany("INSERT INTO history (user_id, original_text, translated_text, target_lang, "
+                           "original_preview, translated_preview, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                           rows[offset:offset + 1000])
+        conn.commit()
+        samples.append(time.perf_counter() - start)
+        conn.close()
+    return samples
+
+
+def bench_history(args, work_dir):
+    """
+    历史记录查询基准：表逐步增长到各目标行数，在每个规模下测量首页、深翻页、详情和检索的耗时。
+    """
+    from benchmarks.sqlite_db import SqliteDatabaseManager
+
+    db = SqliteDatabaseManager(os.path.join(work_dir, "history.db"))
+    results = []
+    try:
+        for i in range(args.users):
+            db.register_user(f"user{i}", "bench")
+        user_id = 1
+        base_time = datetime.datetime(2024, 1, 1)
+        rows = 0
+        for size in sorted(args.history_sizes):
+            insert_samples = seed_history(db, rows, size - rows, args.users, base_time) if size > rows else []
+            rows = max(rows, size)
+            samples = {'first_page': [], 'deep_page': [], 'detail': [], 'search': []}
+            ids = [row[0] for row in db.get_user_history_page(user_id, limit=1000)[0]]
+
+            start = time.perf_counter()
+            for _ in range(args.queries):
+                timed(samples['first_page'], db.get_user_history_page, user_id)
+            first_page_elapsed = time.perf_counter() - start
+
+            # 沿游标连续翻页，直到达到指定页数或没有更多记录
+            cursor = None
+            for _ in range(args.deep_pages):
+                _, cursor = timed(samples['deep_page'], db.get_user_history_page, user_id, cursor)
+                if cursor is None: break
+
+            for _ in range(args.queries):
+                timed(samples['detail'], db.get_history_detail, user_id, random.choice(ids))
+
+            # 第一次检索包含增量建立本地索引的开销，单独记录
+            index_build = []
+            timed(index_build, db.search_history, user_id, random.choice(WORDS))
+            for _ in range(args.queries):
+                timed(samples['search'], db.search_history, user_id, " ".join(random.sample(WORDS, 2)))
+
+            results.append({
+                'rows': rows,
+                'insert': summarize(insert_samples, sum(insert_samples)) if insert_samples else None,
+                'first_page': summarize(samples['first_page'], first_page_elapsed),
+                'deep_page': summarize(samples['deep_page'], sum(samples['deep_page'])),
+                'detail': summarize(samples['detail'], sum(samples['detail'])),
+                'search_index_build_ms': index_build[0] * 1000,
+                'search': summarize(samples['search'], sum(samples['search'])),
+            })
+    finally:
+        db.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="离线基准测试：本地模拟腾讯云接口 + SQLite，输出 JSON 报告")
+    parser.add_argument("--only", choices=("pipeline", "history"), help="只运行其中一组基准")
+    parser.add_argument("--images", type=int, default=50, help="流水线基准处理的图片数")
+    parser.add_argument("--workers", type=int, default=4, help="流水线并发处理的图片数")
+    parser.add_argument("--target", default="en", help="目标语言代码")
+    parser.add_argument("--voice", type=int, default=101001, help="音色 ID")
+    parser.add_argument("--unlimited", action="store_true", help="不限流（默认使用 config.py 中的 QPS 配置）")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="模拟接口的平均延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="模拟接口的延迟抖动（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="模拟接口返回限频错误的概率")
+    parser.add_argument("--history-sizes", type=lambda s: [int(n) for n in s.split(",")],
+                        default=[1000, 10000, 50000], help="历史表逐步增长到的行数，逗号分隔")
+    parser.add_argument("--users", type=int, default=4, help="历史记录分配到的用户数")
+    parser.add_argument("--queries", type=int, default=200, help="每种查询在每个规模下的执行次数")
+    parser.add_argument("--deep-pages", type=int, default=50, help="深翻页基准连续翻页的页数")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("--output", help="报告输出文件，默认输出到标准输出")
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+
+    profile = StubProfile(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    report = {
+        'meta': {
+            'started_at': datetime.datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': vars(args),
+        },
+    }
+    with StubTencentServer(profile) as server, tempfile.TemporaryDirectory(prefix="trans_bench_") as work_dir:
+        configure_environment(server.endpoint)
+        # 被测代码的日志输出到标准错误，标准输出只保留 JSON 报告
+        with contextlib.redirect_stdout(sys.stderr):
+            if args.only in (None, "pipeline"):
+                report['pipeline'] = bench_pipeline(args, work_dir, server)
+            if args.only in (None, "history"):
+                report['history'] = bench_history(args, work_dir)
+            # 各公有方法及接口调用的耗时、错误和负载统计
+            from metrics import metrics
+            report['metrics'] = metrics.snapshot()
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/sqlite_db.py
+import sqlite3
+from database import DatabaseManager
+from db_pool import ConnectionPool
+
+
+def translate_sql(sql):
+    """
+    将 DatabaseManager 使用的 MySQL 语法转换为 SQLite 语法：%s 占位符改为 ?，
+    LEFT(str, n) 改为自定义函数（LEFT 在 SQLite 中是关键字）。
+    """
+    return sql.replace("%s", "?").replace("LEFT(", "mysql_left(")
+
+
+class SqliteCursor:
+    """
+    SQLite 游标包装：执行前通过 translate_sql 转换语句，其余接口直接转发。
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(translate_sql(sql), params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(translate_sql(sql), seq_of_params)
+        return self
+
+
+class SqliteConnection:
+    """
+    提供 DatabaseManager 和 ConnectionPool 所需接口（cursor/start_transaction/commit/rollback/ping/consume_results 等）的 SQLite 连接。
+    """
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # MySQL 的 LEFT(str, n) 用于历史预览列
+        self._conn.create_function("mysql_left", 2, lambda text, n: text[:n] if text is not None else None,
+                                   deterministic=True)
+        self._closed = False
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def cursor(self, buffered=None):
+        # SQLite 游标本身按需逐行读取，无缓冲/非缓冲之分
+        return SqliteCursor(self._conn.cursor())
+
+    def consume_results(self):
+        pass
+
+    def start_transaction(self):
+        # sqlite3 在第一条写语句前自动开启事务
+        pass
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self._conn.execute("SELECT 1")
+
+    def is_connected(self):
+        return not self._closed
+
+    def close(self):
+        self._closed = True
+        self._conn.close()
+
+
+class SqliteDatabaseManager(DatabaseManager):
+    """
+    使用本地 SQLite 文件代替 MySQL 的 DatabaseManager，仅供基准测试使用。
+    表结构与 MySQL 版本迁移后的结构一致；SQLite 不支持 ngram 全文索引，历史检索走本地倒排索引。
+    依赖 MySQL 专有语法的方法（翻译缓存写入、归档）不在基准测试范围内。
+    """
+
+    def __init__(self, path, pool_size=5):
+        """
+        :param path: SQLite 数据库文件路径
+        :param pool_size: 连接池大小
+        """
+        pool = ConnectionPool(None, size=pool_size, connect=lambda: SqliteConnection(path))
+        super().__init__(pool=pool)
+
+    def init_db(self):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+                       CREATE TABLE IF NOT EXISTS users
+                       (
+                           id INTEGER PRIMARY KEY AUTOINCREMENT,
+                           username VARCHAR(255) UNIQUE NOT NULL,
+                           password VARCHAR(255) NOT NULL
+                       )
+                       """)
+        cursor.execute("""
+                       CREATE TABLE IF NOT EXISTS history
+                       (
+                           id INTEGER PRIMARY KEY AUTOINCREMENT,
+                           user_id INT REFERENCES users (id),
+                           original_text TEXT,
+                           translated_text TEXT,
+                           target_lang VARCHAR(10),
+                           created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                           original_preview VARCHAR(60) NOT NULL DEFAULT '',
+                           translated_preview VARCHAR(60) NOT NULL DEFAULT ''
+                       )
+                       """)
+        cursor.execute("""
+                       CREATE TABLE IF NOT EXISTS translation_cache
+                       (
+                           cache_key CHAR(64) PRIMARY KEY,
+                           source_lang VARCHAR(10),
+                           target_lang VARCHAR(10),
+                           translated_text TEXT,
+                           created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                       )
+                       """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_login ON users (username, password)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_list ON history "
+                       "(user_id, created_at, id, target_lang, original_preview, translated_preview)")
+        conn.commit()
+        conn.close()
+        self.fulltext_enabled = False
@@ -0,0 +1,149 @@
+# benchmarks/stub_server.py
+import base64
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubProfile:
+    """
+    模拟接口的行为配置：每个接口的延迟（均值 + 抖动）与错误率。
+    """
+
+    def __init__(self, latency_ms=50.0, jitter_ms=10.0, error_rate=0.0, error_code="RequestLimitExceeded",
+                 audio_bytes=16 * 1024, overrides=None):
+        """
+        :param latency_ms: 平均响应延迟（毫秒）
+        :param jitter_ms: 延迟抖动范围（毫秒），实际延迟在 latency_ms ± jitter_ms 内均匀分布
+        :param error_rate: 返回错误响应的概率（0~1）
+        :param error_code: 错误响应使用的错误码，默认为可重试的限频错误
+        :param audio_bytes: TextToVoice 返回的模拟音频大小（字节）
+        :param overrides: {接口名: {latency_ms/jitter_ms/error_rate: 值}}，按接口覆盖上述配置
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.audio_bytes = audio_bytes
+        self.overrides = overrides or {}
+
+    def get(self, action, name):
+        return self.overrides.get(action, {}).get(name, getattr(self, name))
+
+
+class StubTencentServer:
+    """
+    本地 HTTP 服务，按腾讯云 API 3.0 的响应格式模拟 GeneralAccurateOCR、TextTranslate、
+    TextTranslateBatch、LanguageDetect 和 TextToVoice 接口。SDK 客户端将接入域名指向本服务（http 协议）即可使用，
+    签名不做校验。
+    """
+
+    def __init__(self, profile=None, host="127.0.0.1", port=0):
+        """
+        :param profile: StubProfile 行为配置
+        :param host: 监听地址
+        :param port: 监听端口，0 表示随机分配
+        """
+        self.profile = profile or StubProfile()
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self.calls = {}  # 接口名 -> 请求次数
+        self.errors = {}  # 接口名 -> 返回错误的次数
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-tencent", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, table, action):
+        with self._lock:
+            table[action] = table.get(action, 0) + 1
+
+    def handle(self, action, params):
+        """
+        生成一个接口响应（已包含模拟延迟）。
+        :return: Response 字段的内容
+        """
+        profile = self.profile
+        latency = profile.get(action, 'latency_ms')
+        jitter = profile.get(action, 'jitter_ms')
+        time.sleep(max(0.0, random.uniform(latency - jitter, latency + jitter)) / 1000)
+        self._count(self.calls, action)
+        request_id = str(uuid.uuid4())
+        if random.random() < profile.get(action, 'error_rate'):
+            self._count(self.errors, action)
+            return {'Error': {'Code': profile.error_code, 'Message': "stub error"}, 'RequestId': request_id}
+
+        seq = next(self._counter)
+        if action == "GeneralAccurateOCR":
+            # 每次返回不同的文本，避免后续翻译和语音合成命中缓存
+            lines = [f"第{seq}张图片的第{i}行文字。" for i in range(1, 4)]
+            return {'TextDetections': [{'DetectedText': line, 'Confidence': 99} for line in lines],
+                    'Angle': 0, 'Language': "zh", 'RequestId': request_id}
+        if action == "TextTranslate":
+            return {'TargetText': f"[{params.get('Target')}#{seq}] {params.get('SourceText', '')}",
+                    'Source': "zh", 'Target': params.get('Target'), 'RequestId': request_id}
+        if action == "TextTranslateBatch":
+            texts = [f"[{params.get('Target')}#{seq}] {text}" for text in params.get('SourceTextList', [])]
+            return {'TargetTextList': texts, 'Source': "zh", 'Target': params.get('Target'), 'RequestId': request_id}
+        if action == "LanguageDetect":
+            return {'Lang': "zh", 'RequestId': request_id}
+        if action == "TextToVoice":
+            audio = random.randbytes(profile.audio_bytes)
+            return {'Audio': base64.b64encode(audio).decode('ascii'), 'SessionId': params.get('SessionId', ""),
+                    'RequestId': request_id}
+        return {'Error': {'Code': "InvalidAction", 'Message': f"unsupported action {action}"},
+                'RequestId': request_id}
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 才能保持长连接，与 SDK 客户端的 keep-alive 配合
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length) if length else b"{}"
+                try:
+                    params = json.loads(body or b"{}")
+                except ValueError:
+                    params = {}
+                response = stub.handle(self.headers.get('X-TC-Action', ""), params)
+                payload = json.dumps({'Response': response}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', "application/json")
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def stats(self):
+        with self._lock:
+            return {'calls': dict(self.calls), 'errors': dict(self.errors)}
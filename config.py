@@ -1,6 +1,7 @@
 # config.py
 from dotenv import load_dotenv
 import os
+import tempfile
 
 # 加载.env文件
 load_dotenv()
@@ -9,6 +10,20 @@ load_dotenv()
 TENCENT_SECRET_ID = os.getenv("TENCENT_SECRET_ID")
 TENCENT_SECRET_KEY = os.getenv("TENCENT_SECRET_KEY")
 REGION = os.getenv("REGION", "ap-guangzhou")
+# 各服务的接入域名与 HTTP 连接配置（客户端长连接复用）
+TENCENT_HTTP_SCHEME = os.getenv("TENCENT_HTTP_SCHEME", "https")
+TENCENT_OCR_ENDPOINT = os.getenv("TENCENT_OCR_ENDPOINT", "ocr.tencentcloudapi.com")
+TENCENT_TMT_ENDPOINT = os.getenv("TENCENT_TMT_ENDPOINT", "tmt.tencentcloudapi.com")
+TENCENT_TTS_ENDPOINT = os.getenv("TENCENT_TTS_ENDPOINT", "tts.tencentcloudapi.com")
+TENCENT_CONNECT_TIMEOUT = float(os.getenv("TENCENT_CONNECT_TIMEOUT", "5"))  # 建立连接超时（秒）
+TENCENT_READ_TIMEOUT = float(os.getenv("TENCENT_READ_TIMEOUT", "30"))  # 读取响应超时（秒）
+# 各接口的限流（QPS）与重试配置
+OCR_QPS = float(os.getenv("OCR_QPS", "10"))
+TMT_QPS = float(os.getenv("TMT_QPS", "5"))
+TTS_QPS = float(os.getenv("TTS_QPS", "20"))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))  # 限频/临时性错误的最大重试次数
+API_BACKOFF_BASE = float(os.getenv("API_BACKOFF_BASE", "0.5"))  # 指数退避的初始时长（秒）
+API_BACKOFF_MAX = float(os.getenv("API_BACKOFF_MAX", "8"))  # 单次退避的最长时长（秒）
 
 # 数据库配置
 DB_CONFIG = {
@@ -18,11 +33,78 @@ DB_CONFIG = {
     'database': os.getenv("DB_NAME", "trans_assistant")
 }
 
+# 数据库连接池配置
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))  # 连接池最大连接数
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # 等待空闲连接的最长时间（秒）
+DB_POOL_PING_INTERVAL = float(os.getenv("DB_POOL_PING_INTERVAL", "30"))  # 空闲超过该时长的连接在取出时做健康检查（秒）
+DB_POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "3600"))  # 连接最长存活时间，超过后重建（秒）
+
+# 历史记录分页配置
+HISTORY_PAGE_SIZE = 50  # 历史记录每页加载条数
+HISTORY_PREVIEW_LEN = 60  # 列表中原文/译文预览的最大字符数
+
+# OCR 图片预处理与结果缓存配置
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "2048"))  # 上传前图片最长边像素上限
+OCR_MAX_BASE64_BYTES = int(os.getenv("OCR_MAX_BASE64_BYTES", str(7 * 1024 * 1024)))  # Base64 编码后的大小上限
+OCR_JPEG_QUALITY = int(os.getenv("OCR_JPEG_QUALITY", "85"))  # 重新编码的 JPEG 质量
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "200"))  # OCR 结果缓存条目数
+PREVIEW_MAX_SIDE = 300  # 界面图片预览的最长边像素
+PREVIEW_CACHE_SIZE = int(os.getenv("PREVIEW_CACHE_SIZE", "32"))  # 图片预览缩略图缓存条目数
+
+# 历史记录删除与保留策略配置
+HISTORY_DELETE_CHUNK = 500  # 批量删除时单条 DELETE 语句中的最大 ID 数
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "0"))  # 历史记录保留天数，0 为不归档
+HISTORY_ARCHIVE_BATCH = int(os.getenv("HISTORY_ARCHIVE_BATCH", "500"))  # 每批归档的记录数
+HISTORY_ARCHIVE_INTERVAL = float(os.getenv("HISTORY_ARCHIVE_INTERVAL", "3600"))  # 后台归档的执行间隔（秒）
+
+# 历史记录导出/导入配置
+HISTORY_EXPORT_CHUNK = int(os.getenv("HISTORY_EXPORT_CHUNK", "500"))  # 导出时每次从数据库读取的行数
+HISTORY_IMPORT_BATCH = int(os.getenv("HISTORY_IMPORT_BATCH", "500"))  # 导入时每个事务写入的行数
+
+# 历史记录写后队列配置
+HISTORY_FLUSH_BATCH = int(os.getenv("HISTORY_FLUSH_BATCH", "50"))  # 每批写入的最大条数
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))  # 攒批的最长等待时间（秒）
+HISTORY_FLUSH_RETRIES = int(os.getenv("HISTORY_FLUSH_RETRIES", "3"))  # 批量写入失败的重试次数
+
+# 性能指标配置
+METRICS_SLOW_CALL_MS = float(os.getenv("METRICS_SLOW_CALL_MS", "0"))  # 慢调用日志阈值（毫秒），0 为不记录
+METRICS_EXPORT_PATH = os.getenv("METRICS_EXPORT_PATH", "")  # 退出时导出指标的文件路径（.prom 为 Prometheus 格式，否则为 JSON），留空不导出
+
+# 翻译缓存配置
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "1000"))  # 内存缓存最大条目数
+TRANSLATION_CACHE_TTL = float(os.getenv("TRANSLATION_CACHE_TTL", "86400"))  # 内存缓存条目存活时间（秒）
+
+# 翻译记忆配置
+TM_MAX_ENTRIES = int(os.getenv("TM_MAX_ENTRIES", "50000"))  # 每种目标语言保留的记忆条目数
+TM_FUZZY_THRESHOLD = float(os.getenv("TM_FUZZY_THRESHOLD", "1.0"))  # 模糊匹配直接复用的最低相似度（0~1），1.0 为只复用精确/数字匹配
+TM_MIN_FUZZY_CHARS = int(os.getenv("TM_MIN_FUZZY_CHARS", "10"))  # 参与模糊匹配的最短原文长度
+
+# 分段批量翻译配置
+TMT_BATCH_MAX_CHARS = int(os.getenv("TMT_BATCH_MAX_CHARS", "2000"))  # 单次批量翻译请求的总字符数上限
+TMT_BATCH_MAX_ITEMS = int(os.getenv("TMT_BATCH_MAX_ITEMS", "50"))  # 单次批量翻译请求的片段数上限
+TMT_MAX_WORKERS = int(os.getenv("TMT_MAX_WORKERS", "4"))  # 并发翻译请求数上限
+
+# 长文本语音合成配置
+TTS_MAX_CHARS = int(os.getenv("TTS_MAX_CHARS", "100"))  # 单次 TTS 请求的最大字符数（免费接口限制）
+TTS_MAX_WORKERS = int(os.getenv("TTS_MAX_WORKERS", "3"))  # 并发合成的分片数上限
+
+# 语音缓存配置
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "trans_assistant_tts")  # 缓存目录
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))  # 磁盘缓存字节预算
+TTS_CACHE_MEMORY_BYTES = int(os.getenv("TTS_CACHE_MEMORY_BYTES", str(16 * 1024 * 1024)))  # 内存层字节预算，0 为关闭
+
+# 异步服务层配置
+ASYNC_MAX_WORKERS = int(os.getenv("ASYNC_MAX_WORKERS", "4"))  # 界面请求共用的后台线程数上限
+UI_POLL_INTERVAL_MS = 30  # 主线程轮询后台结果的间隔（毫秒）
+LIVE_TRANSLATE_DEBOUNCE_MS = int(os.getenv("LIVE_TRANSLATE_DEBOUNCE_MS", "500"))  # 实时翻译停止输入后的等待时长（毫秒）
+
 # 语言和音色映射
 LANG_MAP = {
     '中文': 'zh', '英语': 'en', '日语': 'ja', '韩语': 'ko',
     '法语': 'fr', '德语': 'de', '西班牙语': 'es'
 }
+# 语言代码 -> 显示名称（历史记录中存储语言代码）
+LANG_NAMES = {code: name for name, code in LANG_MAP.items()}
 VOICE_MAP = {
     '智瑜 (情感女声)': 101001,
     '智聆 (通用女声)': 101002,
@@ -1,94 +1,97 @@
 # database.py
-import mysql.connector
+import json
+import threading
+import time
+import zlib
 from mysql.connector import Error
-from config import DB_CONFIG
+from config import LANG_MAP, DB_CONFIG, HISTORY_PAGE_SIZE, HISTORY_PREVIEW_LEN, HISTORY_DELETE_CHUNK, HISTORY_RETENTION_DAYS, \
+    HISTORY_ARCHIVE_BATCH, HISTORY_ARCHIVE_INTERVAL, HISTORY_EXPORT_CHUNK, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_PING_INTERVAL, DB_POOL_RECYCLE
+from db_pool import ConnectionPool
+from history_writer import HistoryWriter
+from history_search import NgramIndex, NGRAM_SIZE
+from migrations import migrate, PREVIEW_COLUMN_LEN
+from metrics import metrics, instrument_class
 
+# 写入历史记录的语句：目标语言存语言代码，预览列由 _history_row 生成
+HISTORY_INSERT_SQL = ("INSERT INTO history (user_id, original_text, translated_text, target_lang, "
+                      "original_preview, translated_preview) VALUES (%s, %s, %s, %s, %s, %s)")
 
+
+@instrument_class("db")
 class DatabaseManager:
     """
     数据库管理类：负责所有与 MySQL 数据库的交互逻辑，包括初始化、用户管理和历史记录操作。
 
     """
 
-    def __init__(self):
+    def __init__(self, pool=None):
         """
-        初始化方法：在实例化时尝试建立连接并初始化必要的数据库表。
+        初始化方法：创建连接池，并尝试建立连接初始化必要的数据库表。
+        :param pool: 可选的连接池（如基准测试使用的本地数据库），默认按 DB_CONFIG 连接 MySQL
 
         """
+        # 全文检索状态：首次检索时检查 FULLTEXT 索引是否存在（None 表示尚未检查），不存在时使用本地倒排索引
+        self.fulltext_enabled = None
+        self.search_index = NgramIndex()
+        # 所有方法共享同一个有界连接池，避免每次操作都重新进行 TCP 握手和认证
+        self.pool = pool if pool is not None else ConnectionPool(
+            DB_CONFIG, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+            ping_interval=DB_POOL_PING_INTERVAL, recycle=DB_POOL_RECYCLE)
         self.init_db()
+        # 历史记录写后队列：add_history 的非阻塞版本 enqueue_history 使用
+        self.history_writer = HistoryWriter(self.add_history_batch)
+        # 历史记录保留策略：超过保留天数的记录由后台线程定期归档
+        self._retention_stop = threading.Event()
+        self._retention_thread = None
+        self.start_retention()
 
     def get_connection(self):
         """
-        建立数据库连接。
-        :return: 返回 mysql.connector 连接对象，若连接失败则返回 None。
+        从连接池借出数据库连接，调用 close() 即归还连接池。
+        :return: 返回连接池包装的连接对象，若连接失败或等待超时则返回 None。
 
         """
         try:
-            # 使用 config.py 中定义的 DB_CONFIG 配置信息进行连接
-            return mysql.connector.connect(**DB_CONFIG)
+            # 连接池按 config.py 中定义的 DB_CONFIG 配置信息建立连接
+            return self.pool.acquire()
         except Error as err:
             print(f"Database Connection Error: {err}")
+            metrics.count_error('db.get_connection', type(err).__name__)
             return None
 
     def init_db(self):
         """
-        初始化数据库表结构：创建用户表 (users) 和翻译历史表 (history)。
+        初始化数据库表结构：按 schema_migrations 中记录的版本执行尚未应用的迁移（见 migrations.py）。
+        表结构已是最新时只需一次版本查询，启动时不再执行 DDL。
 
         """
         conn = self.get_connection()
         if conn:
-            cursor = conn.cursor()
-            # 创建用户表：存储用户名和密码
-            cursor.execute("""
-                           CREATE TABLE IF NOT EXISTS users
-                           (
-                               id
-                               INT
-                               AUTO_INCREMENT
-                               PRIMARY
-                               KEY,
-                               username
-                               VARCHAR
-                           (
-                               255
-                           ) UNIQUE NOT NULL,
-                               password VARCHAR
-                           (
-                               255
-                           ) NOT NULL
-                               )
-                           """)
-            # 创建历史记录表：存储原文、译文、目标语言及关联的用户 ID
-            cursor.execute("""
-                           CREATE TABLE IF NOT EXISTS history
-                           (
-                               id
-                               INT
-                               AUTO_INCREMENT
-                               PRIMARY
-                               KEY,
-                               user_id
-                               INT,
-                               original_text
-                               TEXT,
-                               translated_text
-                               TEXT,
-                               target_lang
-                               VARCHAR
-                           (
-                               10
-                           ),
-                               created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                               FOREIGN KEY
-                           (
-                               user_id
-                           ) REFERENCES users
-                           (
-                               id
-                           )
-                               )
-                           """)
-            conn.commit()
+            try:
+                migrate(conn)
+            except Error as err:
+                print(f"Schema Migration Error: {err}")
+            finally:
+                conn.close()
+
+    def _detect_fulltext(self):
+        """
+        检查 history 表上的 ngram 全文索引是否存在（迁移在不支持的 MySQL 版本上会跳过创建）。
+        :return: 存在返回 True；不存在或查询失败返回 False。
+
+        """
+        conn = self.get_connection()
+        if not conn: return False
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = 'history' AND index_name = 'ft_history_text'")
+            return cursor.fetchone()[0] > 0
+        except Error as err:
+            print(f"FULLTEXT index check failed, using local search index: {err}")
+            return False
+        finally:
             conn.close()
 
     def register_user(self, username, password):
@@ -110,7 +113,8 @@ class DatabaseManager:
             # 捕获异常，通常是由于用户名唯一约束冲突
             return False
         finally:
-            if conn.is_connected(): conn.close()
+            # 无论连接是否仍然有效都交还连接池，由连接池决定复用或丢弃
+            conn.close()
 
     def login_user(self, username, password):
         """
@@ -135,18 +139,85 @@ class DatabaseManager:
         :param user_id: 关联的用户 ID
         :param original: 待翻译的原文内容
         :param translated: 翻译后的文本内容
-        :param lang: 目标语言名称
+        :param lang: 目标语言代码（传入界面显示名称时自动转换为代码）
 
         """
         conn = self.get_connection()
         if conn:
             cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO history (user_id, original_text, translated_text, target_lang) VALUES (%s, %s, %s, %s)",
-                (user_id, original, translated, lang))
+            cursor.execute(HISTORY_INSERT_SQL, self._history_row(user_id, original, translated, lang))
             conn.commit()
             conn.close()
 
+    def enqueue_history(self, user_id, original, translated, lang):
+        """
+        非阻塞地添加一条翻译历史记录：记录进入写后队列，由后台线程批量写入。
+        :param user_id: 关联的用户 ID
+        :param original: 待翻译的原文内容
+        :param translated: 翻译后的文本内容
+        :param lang: 目标语言代码
+
+        """
+        self.history_writer.enqueue((user_id, original, translated, lang))
+
+    def flush_history(self, timeout=None):
+        """
+        立即写入写后队列中的全部历史记录并等待完成（退出登录或关闭程序时调用）。
+        :param timeout: 最长等待时间（秒）
+        :return: 队列已清空返回 True，超时返回 False。
+
+        """
+        return self.history_writer.flush(timeout)
+
+    def history_queue_stats(self):
+        """
+        获取历史记录写后队列的统计信息。
+        :return: 包含队列深度、写入批次、写入耗时等字段的字典。
+
+        """
+        return self.history_writer.stats()
+
+    def add_history_batch(self, records):
+        """
+        批量添加翻译历史记录：在一个事务中通过 executemany 写入多行。
+        :param records: (user_id, 原文, 译文, 目标语言代码) 元组列表
+        :return: 写入成功返回 True，连接失败或写入出错返回 False。
+
+        """
+        if not records: return True
+        conn = self.get_connection()
+        if not conn: return False
+        cursor = conn.cursor()
+        try:
+            conn.start_transaction()
+            cursor.executemany(HISTORY_INSERT_SQL, [self._history_row(*record) for record in records])
+            conn.commit()
+            return True
+        except Error as err:
+            print(f"Database Batch Insert Error: {err}")
+            metrics.count_error('db.add_history_batch', type(err).__name__)
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _history_row(user_id, original, translated, lang):
+        """
+        生成 history 表的插入行：目标语言统一存为语言代码，并截取原文/译文预览列。
+        """
+        return (user_id, original, translated, LANG_MAP.get(lang, lang),
+                (original or '')[:PREVIEW_COLUMN_LEN], (translated or '')[:PREVIEW_COLUMN_LEN])
+
+    @staticmethod
+    def _preview_sql(preview_len):
+        """
+        预览列的 SELECT 片段：预览长度不超过预览列长度时读取预览列（可由覆盖索引直接返回），否则截取完整文本。
+        """
+        if preview_len <= PREVIEW_COLUMN_LEN:
+            return "LEFT(original_preview, %s), LEFT(translated_preview, %s)"
+        return "LEFT(original_text, %s), LEFT(translated_text, %s)"
+
     def get_user_history(self, user_id):
         """
         获取指定用户的所有翻译历史。
@@ -164,15 +235,361 @@ class DatabaseManager:
         conn.close()
         return results
 
-    def delete_history(self, history_id):
+    def iter_user_history(self, user_id, chunk_size=HISTORY_EXPORT_CHUNK, after_id=0):
+        """
+        流式读取用户的翻译历史（按 ID 升序），用于导出和加载翻译记忆。
+        使用非缓冲游标：结果集留在服务端，每次 fetchmany 只取一块，内存占用与历史记录总量无关。
+        迭代期间一直占用一个连接池连接，提前停止迭代时会读完剩余结果再归还连接。
+        :param user_id: 用户 ID
+        :param chunk_size: 每次从服务端读取的行数
+        :param after_id: 只读取 ID 大于该值的记录，用于增量读取
+        :return: 生成器，逐条产出 (id, 原文, 译文, 目标语言代码, 创建时间) 元组
+
+        """
+        conn = self.get_connection()
+        if not conn: return
+        cursor = conn.cursor(buffered=False)
+        try:
+            cursor.execute(
+                "SELECT id, original_text, translated_text, target_lang, created_at FROM history "
+                "WHERE user_id=%s AND id>%s ORDER BY id", (user_id, after_id))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows: break
+                yield from rows
+        finally:
+            # 非缓冲游标必须读完结果集，连接才能执行下一条语句
+            conn.consume_results()
+            conn.close()
+
+    def import_history_batch(self, records):
+        """
+        在一个事务中批量导入历史记录，保留原有的创建时间。
+        :param records: (user_id, 原文, 译文, 目标语言代码或名称, 创建时间) 元组列表，创建时间为 None 时取当前时间
+        :return: 写入成功返回 True，连接失败或写入出错返回 False。
+
+        """
+        if not records: return True
+        conn = self.get_connection()
+        if not conn: return False
+        cursor = conn.cursor()
+        try:
+            conn.start_transaction()
+            cursor.executemany(
+                "INSERT INTO history (user_id, original_text, translated_text, target_lang, original_preview, "
+                "translated_preview, created_at) VALUES (%s, %s, %s, %s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP))",
+                [(*self._history_row(*record[:4]), record[4]) for record in records])
+            conn.commit()
+            return True
+        except Error as err:
+            print(f"Database Import Error: {err}")
+            metrics.count_error('db.import_history_batch', type(err).__name__)
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    def get_user_history_page(self, user_id, cursor=None, limit=HISTORY_PAGE_SIZE, preview_len=HISTORY_PREVIEW_LEN):
+        """
+        按游标（keyset）分页获取用户的翻译历史，仅返回截断后的预览列。
+        :param user_id: 用户 ID
+        :param cursor: 上一页返回的游标 (created_at, id)，为 None 时从最新记录开始
+        :param limit: 每页条数
+        :param preview_len: 原文/译文预览的最大字符数
+        :return: (records, next_cursor) 二元组；records 为 (id, 原文预览, 译文预览, 目标语言代码, 创建时间) 元组列表，
+                 next_cursor 为下一页游标，没有更多记录时为 None。
+
+        """
+        conn = self.get_connection()
+        if not conn: return [], None
+        db_cursor = conn.cursor()
+        sql = f"SELECT id, {self._preview_sql(preview_len)}, target_lang, created_at FROM history WHERE user_id=%s"
+        params = [preview_len, preview_len, user_id]
+        if cursor is not None:
+            # 行值比较展开为 OR 形式，以便 MySQL 能够利用 (user_id, created_at, id) 索引做范围扫描
+            created_at, last_id = cursor
+            sql += " AND (created_at < %s OR (created_at = %s AND id < %s))"
+            params += [created_at, created_at, last_id]
+        # 多取一条用于判断是否还有下一页
+        sql += " ORDER BY created_at DESC, id DESC LIMIT %s"
+        params.append(limit + 1)
+        db_cursor.execute(sql, tuple(params))
+        results = db_cursor.fetchall()
+        conn.close()
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            return results, (last[4], last[0])
+        return results, None
+
+    def get_history_detail(self, user_id, history_id):
+        """
+        获取单条历史记录的完整原文和译文。
+        :param user_id: 用户 ID（用于限定只能读取自己的记录）
+        :param history_id: 历史记录 ID
+        :return: (id, 原文, 译文, 目标语言代码, 创建时间) 元组，不存在时返回 None。
+
+        """
+        conn = self.get_connection()
+        if not conn: return None
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, original_text, translated_text, target_lang, created_at FROM history WHERE id=%s AND user_id=%s",
+            (history_id, user_id))
+        result = cursor.fetchone()
+        conn.close()
+        return result
+
+    def search_history(self, user_id, query, limit=HISTORY_PAGE_SIZE, offset=0, preview_len=HISTORY_PREVIEW_LEN):
+        """
+        在当前用户的历史记录中检索原文或译文，结果按时间倒序分页返回。
+        优先使用 ngram 全文索引；查询词短于 ngram 长度时退回 LIKE 扫描；
+        不支持 FULLTEXT 的后端使用本地倒排索引。
+        :param user_id: 用户 ID
+        :param query: 检索词，多个词以空白分隔，需同时命中
+        :param limit: 每页条数
+        :param offset: 偏移量
+        :param preview_len: 原文/译文预览的最大字符数
+        :return: 与 get_user_history_page 相同格式的记录元组列表
+
+        """
+        terms = query.split()
+        if not terms: return []
+        if self.fulltext_enabled is None:
+            self.fulltext_enabled = self._detect_fulltext()
+        if not self.fulltext_enabled:
+            return self._search_local(user_id, terms, limit, offset, preview_len)
+        conn = self.get_connection()
+        if not conn: return []
+        cursor = conn.cursor()
+        sql = f"SELECT id, {self._preview_sql(preview_len)}, target_lang, created_at FROM history WHERE user_id=%s"
+        params = [preview_len, preview_len, user_id]
+        if all(len(term) >= NGRAM_SIZE for term in terms):
+            # 布尔模式下每个词作为必须命中的短语，ngram 解析器会将其拆分为连续的 n 元组匹配
+            sql += " AND MATCH(original_text, translated_text) AGAINST (%s IN BOOLEAN MODE)"
+            params.append(" ".join('+"{}"'.format(term.replace('"', ' ')) for term in terms))
+        else:
+            for term in terms:
+                sql += " AND (original_text LIKE %s OR translated_text LIKE %s)"
+                pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                params += [pattern, pattern]
+        sql += " ORDER BY created_at DESC, id DESC LIMIT %s OFFSET %s"
+        params += [limit, offset]
+        cursor.execute(sql, tuple(params))
+        results = cursor.fetchall()
+        conn.close()
+        return results
+
+    def _search_local(self, user_id, terms, limit, offset, preview_len):
+        """
+        本地倒排索引检索：先增量索引新增的记录，再按 (created_at, id) 倒序取候选 ID 回表确认，排序与 FULLTEXT 检索一致。
         """
-        根据 ID 删除特定的历史记录。
+        conn = self.get_connection()
+        if not conn: return []
+        cursor = conn.cursor()
+        # 增量索引自上次检索以来新增的记录
+        cursor.execute(
+            "SELECT id, original_text, translated_text, created_at FROM history WHERE user_id=%s AND id > %s ORDER BY id",
+            (user_id, self.search_index.last_indexed_id(user_id)))
+        for history_id, original, translated, created_at in cursor:
+            self.search_index.add(user_id, history_id, created_at, original, translated)
+
+        results = []
+        lowered = [term.lower() for term in terms]
+        candidates = self.search_index.candidates(user_id, " ".join(terms))
+        # 按批回表，确认子串确实命中（同时过滤已删除的记录），直到凑够一页
+        skipped = 0
+        for start in range(0, len(candidates), 200):
+            chunk = candidates[start:start + 200]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"SELECT id, original_text, translated_text, target_lang, created_at FROM history "
+                f"WHERE user_id=%s AND id IN ({placeholders}) ORDER BY created_at DESC, id DESC",
+                (user_id, *chunk))
+            for history_id, original, translated, lang, created_at in cursor.fetchall():
+                haystack = f"{original or ''}\n{translated or ''}".lower()
+                if not all(term in haystack for term in lowered): continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                results.append((history_id, (original or '')[:preview_len], (translated or '')[:preview_len],
+                                lang, created_at))
+                if len(results) >= limit: break
+            if len(results) >= limit: break
+        conn.close()
+        return results
+
+    def delete_history(self, history_id, user_id):
+        """
+        根据 ID 删除当前用户的特定历史记录。
         :param history_id: 历史记录的唯一标识 ID
+        :param user_id: 用户 ID（仅删除属于该用户的记录）
+        :return: 实际删除的行数，记录不属于该用户、连接失败或出错时返回 0。
+
+        """
+        return self.delete_history_bulk(user_id, [history_id])
+
+    def delete_history_bulk(self, user_id, history_ids, chunk_size=HISTORY_DELETE_CHUNK):
+        """
+        批量删除当前用户的历史记录：在一个事务中以 IN 列表执行（超长列表按 chunk_size 分成多条语句）。
+        :param user_id: 用户 ID（仅删除属于该用户的记录）
+        :param history_ids: 历史记录 ID 列表
+        :param chunk_size: 单条 DELETE 语句中的最大 ID 数
+        :return: 实际删除的行数，连接失败或出错时返回 0。
+
+        """
+        ids = list(dict.fromkeys(int(i) for i in history_ids))
+        if not ids: return 0
+        conn = self.get_connection()
+        if not conn: return 0
+        cursor = conn.cursor()
+        deleted = 0
+        try:
+            conn.start_transaction()
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start:start + chunk_size]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"DELETE FROM history WHERE user_id=%s AND id IN ({placeholders})", (user_id, *chunk))
+                deleted += cursor.rowcount
+            conn.commit()
+            return deleted
+        except Error as err:
+            print(f"Database Bulk Delete Error: {err}")
+            metrics.count_error('db.delete_history_bulk', type(err).__name__)
+            conn.rollback()
+            return 0
+        finally:
+            conn.close()
+
+    def archive_history(self, days, batch_size=HISTORY_ARCHIVE_BATCH, pause=0.1):
+        """
+        将超过保留期的历史记录分批移入 history_archive 表：原文和译文以 zlib 压缩的 JSON 保存。
+        每批在一个事务中完成“锁定读取 -> 写入归档 -> 删除原记录”，批次之间短暂停顿以减少对前台查询的影响。
+        :param days: 保留天数，早于该天数的记录会被归档
+        :param batch_size: 每批处理的记录数
+        :param pause: 批次之间的停顿时间（秒）
+        :return: 本次归档的记录总数。
+
+        """
+        total = 0
+        while True:
+            conn = self.get_connection()
+            if not conn: return total
+            cursor = conn.cursor()
+            try:
+                conn.start_transaction()
+                cursor.execute(
+                    "SELECT id, user_id, original_text, translated_text, target_lang, created_at FROM history "
+                    "WHERE created_at < NOW() - INTERVAL %s DAY ORDER BY id LIMIT %s FOR UPDATE",
+                    (days, batch_size))
+                rows = cursor.fetchall()
+                if rows:
+                    cursor.executemany(
+                        "INSERT IGNORE INTO history_archive (id, user_id, target_lang, created_at, payload) "
+                        "VALUES (%s, %s, %s, %s, %s)",
+                        [(r[0], r[1], r[4], r[5], self._compress_history(r[2], r[3])) for r in rows])
+                    placeholders = ", ".join(["%s"] * len(rows))
+                    cursor.execute(f"DELETE FROM history WHERE id IN ({placeholders})", tuple(r[0] for r in rows))
+                conn.commit()
+            except Error as err:
+                print(f"History Archive Error: {err}")
+                metrics.count_error('db.archive_history', type(err).__name__)
+                conn.rollback()
+                return total
+            finally:
+                conn.close()
+            total += len(rows)
+            if len(rows) < batch_size: return total
+            time.sleep(pause)
+
+    @staticmethod
+    def _compress_history(original, translated):
+        return zlib.compress(json.dumps({'original': original, 'translated': translated},
+                                        ensure_ascii=False).encode('utf-8'))
+
+    def get_archived_history(self, user_id, history_id):
+        """
+        读取并解压一条已归档的历史记录。
+        :return: (id, 原文, 译文, 目标语言代码, 创建时间) 元组，不存在时返回 None。
+
+        """
+        conn = self.get_connection()
+        if not conn: return None
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, payload, target_lang, created_at FROM history_archive WHERE id=%s AND user_id=%s",
+                       (history_id, user_id))
+        row = cursor.fetchone()
+        conn.close()
+        if not row: return None
+        payload = json.loads(zlib.decompress(row[1]).decode('utf-8'))
+        return row[0], payload['original'], payload['translated'], row[2], row[3]
+
+    def start_retention(self, days=HISTORY_RETENTION_DAYS, interval=HISTORY_ARCHIVE_INTERVAL):
+        """
+        启动后台归档线程：每隔 interval 秒执行一次 archive_history。
+        :param days: 保留天数，不大于 0 时不启动
+        :param interval: 两次归档之间的间隔（秒）
+
+        """
+        if days <= 0 or self._retention_thread is not None: return
+
+        def run():
+            while not self._retention_stop.is_set():
+                moved = self.archive_history(days)
+                if moved:
+                    print(f"History Archive: moved {moved} records older than {days} days")
+                self._retention_stop.wait(interval)
+
+        self._retention_thread = threading.Thread(target=run, name="history-retention", daemon=True)
+        self._retention_thread.start()
+
+    def get_cached_translation(self, cache_key):
+        """
+        从持久化翻译缓存表中读取译文。
+        :param cache_key: 由 TranslationCache.make_key 生成的缓存键
+        :return: 缓存的译文，未命中或连接失败返回 None。
+
+        """
+        conn = self.get_connection()
+        if not conn: return None
+        cursor = conn.cursor()
+        cursor.execute("SELECT translated_text FROM translation_cache WHERE cache_key=%s", (cache_key,))
+        result = cursor.fetchone()
+        conn.close()
+        return result[0] if result else None
+
+    def save_cached_translation(self, cache_key, source_lang, target_lang, translated):
+        """
+        写入（或覆盖）持久化翻译缓存。
+        :param cache_key: 缓存键
+        :param source_lang: 源语言代码
+        :param target_lang: 目标语言代码
+        :param translated: 译文
 
         """
         conn = self.get_connection()
         if conn:
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM history WHERE id=%s", (history_id,))
+            cursor.execute(
+                "INSERT INTO translation_cache (cache_key, source_lang, target_lang, translated_text) "
+                "VALUES (%s, %s, %s, %s) ON DUPLICATE KEY UPDATE translated_text=VALUES(translated_text)",
+                (cache_key, source_lang, target_lang, translated))
             conn.commit()
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+    def pool_stats(self):
+        """
+        获取数据库连接池的统计信息。
+        :return: 包含借出数量、空闲数量、等待耗时、未命中次数等字段的字典。
+
+        """
+        return self.pool.stats()
+
+    def close(self):
+        """
+        写完历史记录队列中的剩余记录，并关闭连接池中的所有空闲连接，程序退出时调用。
+
+        """
+        self._retention_stop.set()
+        self.history_writer.close()
+        self.pool.close_all()
\ No newline at end of file
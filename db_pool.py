@@ -0,0 +1,235 @@
+# db_pool.py
+import functools
+import queue
+import threading
+import time
+import mysql.connector
+from mysql.connector import Error
+from mysql.connector.errors import PoolError, IntegrityError, ProgrammingError, DataError
+
+# 语句级错误（约束冲突、SQL 语法错误、数据错误）不影响连接本身，其余 Error 视为连接已损坏
+STATEMENT_ERRORS = (IntegrityError, ProgrammingError, DataError)
+
+
+def _guard(owner, func):
+    """
+    包装连接或游标的方法：调用时抛出连接级 Error 则将所属连接标记为已损坏，归还时直接关闭。
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Error as err:
+            if not isinstance(err, STATEMENT_ERRORS):
+                owner.broken = True
+            raise
+
+    return wrapper
+
+
+class GuardedCursor:
+    """
+    借出连接上创建的游标：属性和方法直接转发给底层游标，执行出错时标记所属连接。
+    """
+
+    def __init__(self, owner, cursor):
+        self._owner = owner
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        return _guard(self._owner, attr) if callable(attr) else attr
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+class PooledConnection:
+    """
+    连接池中借出的连接包装对象：除 close() 外的所有属性和方法都直接转发给底层 mysql.connector 连接。
+    调用 close() 不会真正断开连接，而是将其归还连接池，因此 DatabaseManager 中原有的
+    “获取连接 -> 执行 -> close()” 写法无需改动即可复用连接。
+    借出期间（包括其游标上）抛出连接级 Error 时，连接在归还时被关闭而不是放回池中。
+    """
+
+    def __init__(self, pool, raw_conn):
+        self._pool = pool
+        self._conn = raw_conn
+        self.broken = False
+
+    def __getattr__(self, name):
+        attr = getattr(self._conn, name)
+        return _guard(self, attr) if callable(attr) else attr
+
+    def cursor(self, *args, **kwargs):
+        return GuardedCursor(self, _guard(self, self._conn.cursor)(*args, **kwargs))
+
+    def close(self):
+        """
+        归还连接到连接池。重复调用是安全的。
+        """
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn, self.broken)
+
+    def is_connected(self):
+        return self._conn is not None and self._conn.is_connected()
+
+    def __del__(self):
+        # 兜底：若调用方因异常未执行 close()，在对象回收时归还连接，避免占用连接池名额
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    有界、线程安全的 MySQL 连接池。
+    - 最多同时借出 size 个连接，超出时阻塞等待，等待超过 timeout 秒抛出 PoolError；
+    - 取出时对空闲较久的连接做 ping 健康检查，失效则自动重连；归还时不再检查，不增加额外的网络往返；
+    - 借出期间出现连接级错误的连接、超过 recycle 秒的连接在归还时关闭，下次取出时重新建立；
+    - 默认开启 autocommit，只读查询不会留下打开的事务，归还时无需回滚；多语句写入需显式 start_transaction()；
+    - 通过 stats() 暴露借出数量、等待耗时、未命中（新建连接）次数等统计信息。
+    """
+
+    def __init__(self, config, size=5, timeout=10.0, ping_interval=30.0, recycle=3600.0, connect=None):
+        """
+        :param config: 传给 mysql.connector.connect 的连接参数字典
+        :param size: 连接池最大连接数
+        :param timeout: 获取连接的最长等待时间（秒）
+        :param ping_interval: 空闲超过该时长的连接在取出时执行健康检查（秒）
+        :param recycle: 连接最长存活时间（秒），超过后关闭重建
+        :param connect: 可选的连接工厂函数，默认使用 mysql.connector.connect(autocommit=True, **config)
+        """
+        self.config = config
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.recycle = recycle
+        self._connect = connect or (lambda: mysql.connector.connect(**{'autocommit': True, **self.config}))
+        # 空闲连接栈（后进先出，优先复用最近使用的“热”连接），元素为 (连接, 创建时间, 最近归还时间)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._meta = {}
+        self._stats = {
+            'checkouts': 0,  # 累计借出次数
+            'in_use': 0,  # 当前借出中的连接数
+            'misses': 0,  # 无可用空闲连接而新建连接的次数
+            'reconnects': 0,  # 健康检查失败后重连成功的次数
+            'timeouts': 0,  # 等待超时次数
+            'wait_time_total': 0.0,  # 累计等待耗时（秒）
+            'wait_time_max': 0.0,  # 单次最长等待耗时（秒）
+        }
+
+    def acquire(self):
+        """
+        从连接池借出一个连接。
+        :return: PooledConnection 包装对象
+        :raises PoolError: 等待超时
+        :raises mysql.connector.Error: 新建连接失败
+        """
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise PoolError(f"Connection pool exhausted (size={self.size}, timeout={self.timeout}s)")
+        waited = time.perf_counter() - start
+        try:
+            raw = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['in_use'] += 1
+            self._stats['wait_time_total'] += waited
+            self._stats['wait_time_max'] = max(self._stats['wait_time_max'], waited)
+        return PooledConnection(self, raw)
+
+    def _checkout(self):
+        """
+        取出一个可用的底层连接：优先复用空闲连接并按需做健康检查，否则新建连接。
+        """
+        now = time.monotonic()
+        while True:
+            try:
+                conn, created, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if now - created > self.recycle:
+                self._discard(conn)
+                continue
+            if now - last_used > self.ping_interval:
+                try:
+                    # 健康检查：连接失效时尝试一次重连，重连也失败则丢弃
+                    conn.ping()
+                except Error:
+                    try:
+                        conn.reconnect(attempts=1, delay=0)
+                    except Error:
+                        self._discard(conn)
+                        continue
+                    created = time.monotonic()
+                    with self._lock:
+                        self._stats['reconnects'] += 1
+            self._meta[id(conn)] = created
+            return conn
+
+        with self._lock:
+            self._stats['misses'] += 1
+        conn = self._connect()
+        self._meta[id(conn)] = time.monotonic()
+        return conn
+
+    def release(self, conn, broken=False):
+        """
+        归还连接。仍处于显式事务中（如出错后未回滚）的连接会先回滚，避免下一个使用者看到旧的事务快照。
+        :param broken: 借出期间是否出现过连接级错误，是则直接关闭
+        """
+        created = self._meta.pop(id(conn), time.monotonic())
+        try:
+            if broken or time.monotonic() - created > self.recycle:
+                self._discard(conn)
+            else:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put((conn, created, time.monotonic()))
+        except Error:
+            self._discard(conn)
+        finally:
+            with self._lock:
+                self._stats['in_use'] -= 1
+            self._slots.release()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Error:
+            pass
+
+    def close_all(self):
+        """
+        关闭所有空闲连接（借出中的连接在归还后仍会回到池中）。
+        """
+        while True:
+            try:
+                conn, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+    def stats(self):
+        """
+        获取连接池统计信息快照。
+        :return: 包含 size、idle、in_use、checkouts、misses、reconnects、timeouts、等待耗时等字段的字典
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['size'] = self.size
+        snapshot['idle'] = self._idle.qsize()
+        checkouts = snapshot['checkouts']
+        snapshot['wait_time_avg'] = snapshot['wait_time_total'] / checkouts if checkouts else 0.0
+        return snapshot
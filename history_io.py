@@ -0,0 +1,184 @@
+# history_io.py
+import argparse
+import csv
+import datetime
+import json
+import os
+import re
+import time
+
+from config import HISTORY_EXPORT_CHUNK, HISTORY_IMPORT_BATCH, LANG_MAP
+
+# 导出文件的字段顺序（CSV 表头与 JSONL 键名）
+FIELDS = ("created_at", "target_lang", "original_text", "translated_text")
+# 支持的导出/导入格式，按文件扩展名识别
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl"}
+# 导出文件中的时间格式
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# history.target_lang 列可保存的语言代码（ASCII，最长 10 个字符）
+LANG_CODE_PATTERN = re.compile(r"[A-Za-z]{2,3}(?:-[A-Za-z0-9]{1,6})?")
+
+
+def detect_format(path, fmt=None):
+    """
+    确定文件格式：优先使用显式指定的格式，否则按扩展名识别。
+    :return: 'csv' 或 'jsonl'
+    """
+    if fmt: return fmt
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"unsupported history file type: {ext or path}")
+    return FORMATS[ext]
+
+
+def _format_time(value):
+    if isinstance(value, datetime.datetime):
+        return value.strftime(TIME_FORMAT)
+    return str(value) if value is not None else ""
+
+
+def _parse_row(record):
+    """
+    校验并规范化导入文件中的一条记录，写入前排除会导致整批失败的数据。
+    JSONL 中的字段可能是任意 JSON 类型，原文和译文必须是非空字符串，语言和时间必须是字符串或缺省（null）。
+    :return: (原文, 译文, 语言代码, 创建时间或 None)；缺少原文/译文、字段类型不对、语言或时间无法识别时返回 None
+    """
+    if not record: return None
+    original, translated = record.get("original_text"), record.get("translated_text")
+    if not isinstance(original, str) or not isinstance(translated, str): return None
+    if not original or not translated: return None
+    lang, created_at = record.get("target_lang"), record.get("created_at")
+    if not all(value is None or isinstance(value, str) for value in (lang, created_at)): return None
+    lang = (lang or "").strip()
+    lang = LANG_MAP.get(lang, lang)
+    if lang and not LANG_CODE_PATTERN.fullmatch(lang): return None
+    created_at = (created_at or "").strip()
+    if created_at:
+        try:
+            datetime.datetime.strptime(created_at, TIME_FORMAT)
+        except ValueError:
+            return None
+    return original, translated, lang, created_at or None
+
+
+def export_history(db, user_id, path, fmt=None, chunk_size=HISTORY_EXPORT_CHUNK, progress=None):
+    """
+    将用户的全部翻译历史流式导出到文件。记录逐块从数据库读取、逐行写出，内存占用与记录总量无关。
+    :param db: DatabaseManager 实例
+    :param user_id: 用户 ID
+    :param path: 导出文件路径（.csv 或 .jsonl）
+    :param fmt: 文件格式，默认按扩展名识别
+    :param chunk_size: 每次从数据库读取的行数
+    :param progress: 进度回调 progress(已导出行数)，每写完一块调用一次
+    :return: {'rows': 导出行数, 'elapsed_s': 耗时（秒）}
+    """
+    fmt = detect_format(path, fmt)
+    start = time.perf_counter()
+    rows = 0
+    # 先写入临时文件，完成后再替换，导出中途失败不会留下不完整的文件
+    tmp_path = path + ".part"
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f) if fmt == "csv" else None
+            if writer: writer.writerow(FIELDS)
+            for _, original, translated, lang, created_at in db.iter_user_history(user_id, chunk_size):
+                record = (_format_time(created_at), lang or "", original or "", translated or "")
+                if writer:
+                    writer.writerow(record)
+                else:
+                    f.write(json.dumps(dict(zip(FIELDS, record)), ensure_ascii=False) + "\n")
+                rows += 1
+                if progress and rows % chunk_size == 0: progress(rows)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        raise
+    if progress: progress(rows)
+    return {'rows': rows, 'elapsed_s': time.perf_counter() - start}
+
+
+def read_history_file(path, fmt=None):
+    """
+    逐条解析导出文件，不一次性读入整个文件。
+    :return: 生成器，逐条产出字段字典；无法解析的 JSONL 行产出 None
+    """
+    fmt = detect_format(path, fmt)
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            line = line.strip()
+            if not line: continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield record if isinstance(record, dict) else None
+
+
+def import_history(db, user_id, path, fmt=None, batch_size=HISTORY_IMPORT_BATCH, progress=None):
+    """
+    从导出文件流式导入翻译历史到指定用户。记录边解析边按批写入，每批一个事务，内存中最多保留一批记录。
+    缺少原文或译文、目标语言或创建时间无法识别的记录跳过；某一批写入失败时计入失败数并继续导入后续批次。
+    :param db: DatabaseManager 实例
+    :param user_id: 导入到的用户 ID
+    :param path: 导入文件路径（.csv 或 .jsonl）
+    :param fmt: 文件格式，默认按扩展名识别
+    :param batch_size: 每个事务写入的行数
+    :param progress: 进度回调 progress(已导入行数)，每写完一批调用一次
+    :return: {'rows': 导入行数, 'skipped': 跳过行数, 'failed': 写入失败行数, 'elapsed_s': 耗时（秒）}
+    """
+    start = time.perf_counter()
+    stats = {'rows': 0, 'skipped': 0, 'failed': 0}
+    batch = []
+
+    def flush():
+        if db.import_history_batch(batch):
+            stats['rows'] += len(batch)
+        else:
+            stats['failed'] += len(batch)
+        batch.clear()
+        if progress: progress(stats['rows'])
+
+    for record in read_history_file(path, fmt):
+        row = _parse_row(record)
+        if row is None:
+            stats['skipped'] += 1
+            continue
+        batch.append((user_id, *row))
+        if len(batch) >= batch_size: flush()
+    if batch: flush()
+    stats['elapsed_s'] = time.perf_counter() - start
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="流式导出/导入用户的翻译历史（CSV 或 JSONL）")
+    parser.add_argument("action", choices=("export", "import"))
+    parser.add_argument("path", help="导出/导入文件路径（.csv 或 .jsonl）")
+    parser.add_argument("--user-id", type=int, required=True, help="用户 ID")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="文件格式，默认按扩展名识别")
+    parser.add_argument("--batch", type=int, help="每次读取/写入的行数")
+    args = parser.parse_args(argv)
+
+    from database import DatabaseManager
+    db = DatabaseManager()
+
+    def report(rows):
+        print(f"History {args.action}: {rows} rows")
+
+    try:
+        if args.action == "export":
+            stats = export_history(db, args.user_id, args.path, args.format,
+                                   args.batch or HISTORY_EXPORT_CHUNK, report)
+        else:
+            stats = import_history(db, args.user_id, args.path, args.format,
+                                   args.batch or HISTORY_IMPORT_BATCH, report)
+    finally:
+        db.close()
+    print(json.dumps(stats, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# history_search.py
+import re
+import threading
+
+# 与 MySQL ngram 解析器的默认 ngram_token_size 保持一致
+NGRAM_SIZE = 2
+
+
+def ngrams(text, n=NGRAM_SIZE):
+    """
+    将文本切分为 n 元字符组（忽略大小写，不跨越空白），中日韩文本无需分词即可检索。
+    :return: n-gram 集合；某段文本短于 n 时保留其本身
+    """
+    tokens = set()
+    for run in re.split(r"\s+", text.lower()):
+        if not run: continue
+        if len(run) < n:
+            tokens.add(run)
+            continue
+        for i in range(len(run) - n + 1):
+            tokens.add(run[i:i + n])
+    return tokens
+
+
+def index_tokens(text):
+    """
+    建立索引用的词项：单字 + 二元组，使单字查询也能命中。
+    """
+    return ngrams(text, 1) | ngrams(text, NGRAM_SIZE)
+
+
+class NgramIndex:
+    """
+    本地倒排索引：不支持 FULLTEXT 的数据库后端的检索兜底方案。
+    每个用户一份 n-gram -> 记录 ID 集合 的倒排表，按记录 ID 增量追加新行；
+    同时保存每条记录的创建时间，候选按 (创建时间, ID) 倒序返回，与 FULLTEXT 检索的排序一致；
+    检索结果只是候选集，最终由调用方回表按子串确认（已删除的记录自然被过滤掉）。
+    """
+
+    def __init__(self):
+        self._postings = {}  # user_id -> {ngram: set(history_id)}
+        self._max_id = {}  # user_id -> 已建立索引的最大记录 ID
+        self._created = {}  # user_id -> {history_id: created_at}
+        self._lock = threading.Lock()
+
+    def last_indexed_id(self, user_id):
+        return self._max_id.get(user_id, 0)
+
+    def add(self, user_id, history_id, created_at, *texts):
+        """
+        将一条记录加入索引。
+        :param created_at: 记录的创建时间，用于候选排序
+        """
+        with self._lock:
+            self._created.setdefault(user_id, {})[history_id] = created_at
+            postings = self._postings.setdefault(user_id, {})
+            for text in texts:
+                for gram in index_tokens(text or ""):
+                    postings.setdefault(gram, set()).add(history_id)
+            self._max_id[user_id] = max(self._max_id.get(user_id, 0), history_id)
+
+    def candidates(self, user_id, query):
+        """
+        查找可能包含 query 中所有词的记录 ID。
+        :return: 按 (创建时间, ID) 倒序排列的候选 ID 列表
+        """
+        grams = set()
+        for term in query.split():
+            grams |= ngrams(term)
+        if not grams:
+            return []
+        with self._lock:
+            postings = self._postings.get(user_id, {})
+            # 从最短的倒排链开始求交集
+            lists = sorted((postings.get(gram, set()) for gram in grams), key=len)
+            result = set(lists[0])
+            for ids in lists[1:]:
+                result &= ids
+                if not result: break
+            created = self._created.get(user_id, {})
+            return sorted(result, key=lambda history_id: (created[history_id], history_id), reverse=True)
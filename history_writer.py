@@ -0,0 +1,128 @@
+# history_writer.py
+import queue
+import threading
+import time
+from config import HISTORY_FLUSH_BATCH, HISTORY_FLUSH_INTERVAL, HISTORY_FLUSH_RETRIES
+
+
+class HistoryWriter:
+    """
+    历史记录写后（write-behind）队列：调用方入队后立即返回，由后台线程批量写入数据库。
+    攒满 batch_size 条或距第一条入队超过 interval 秒时触发一次写入（一个事务内 executemany 多行）。
+    """
+
+    def __init__(self, write_batch, batch_size=HISTORY_FLUSH_BATCH, interval=HISTORY_FLUSH_INTERVAL,
+                 retries=HISTORY_FLUSH_RETRIES):
+        """
+        :param write_batch: 批量写入函数，接收记录元组列表，成功返回 True；返回 False 或抛出异常均视为写入失败
+        :param batch_size: 每批最大条数
+        :param interval: 最长攒批等待时间（秒）
+        :param retries: 写入失败时的重试次数，用尽后丢弃该批并计数
+        """
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retries = retries
+        self._queue = queue.Queue()
+        self._flush_now = threading.Event()
+        self._stopping = False
+        self._lock = threading.Lock()
+        self._stats = {'enqueued': 0, 'written': 0, 'dropped': 0, 'flushes': 0,
+                       'flush_time_total': 0.0, 'flush_time_max': 0.0}
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, record):
+        """
+        记录入队（不阻塞）。
+        :param record: (user_id, 原文, 译文, 目标语言代码) 元组
+        """
+        self._queue.put(record)
+        with self._lock:
+            self._stats['enqueued'] += 1
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopping:
+                    return
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.interval
+            # 攒批：直到达到条数上限、等待超时或收到立即刷新请求
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if self._flush_now.is_set() or self._stopping:
+                    remaining = 0
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, remaining)) if remaining > 0
+                                 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+            if self._queue.unfinished_tasks == 0:
+                self._flush_now.clear()
+
+    def _write(self, batch):
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            try:
+                written = self.write_batch(batch)
+            except Exception as e:
+                # 写入函数抛出的异常同样视为一次失败，后台线程继续运行
+                print(f"History Writer Error: {e}")
+                written = False
+            if written:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._stats['written'] += len(batch)
+                    self._stats['flushes'] += 1
+                    self._stats['flush_time_total'] += elapsed
+                    self._stats['flush_time_max'] = max(self._stats['flush_time_max'], elapsed)
+                return
+            if attempt < self.retries:
+                time.sleep(min(2 ** attempt, 5))
+        print(f"History Writer Error: dropped {len(batch)} records after {self.retries + 1} attempts")
+        with self._lock:
+            self._stats['dropped'] += len(batch)
+
+    def flush(self, timeout=None):
+        """
+        立即写入队列中的所有记录并等待完成。
+        :param timeout: 最长等待时间（秒），为 None 时一直等待
+        :return: 队列已清空返回 True，超时返回 False
+        """
+        self._flush_now.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        self._flush_now.clear()
+        return True
+
+    def close(self, timeout=10):
+        """
+        写完剩余记录后停止后台线程，程序退出时调用。
+        """
+        drained = self.flush(timeout)
+        self._stopping = True
+        self._thread.join(timeout=1)
+        return drained
+
+    def stats(self):
+        """
+        :return: 包含队列深度、已写入/丢弃条数、写入批次数及写入耗时的字典
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['queue_depth'] = self._queue.unfinished_tasks
+        flushes = snapshot['flushes']
+        snapshot['flush_time_avg'] = snapshot['flush_time_total'] / flushes if flushes else 0.0
+        return snapshot
@@ -0,0 +1,97 @@
+# image_utils.py
+import base64
+import io
+from collections import namedtuple
+from PIL import Image, ImageOps
+from config import OCR_MAX_SIDE, OCR_MAX_BASE64_BYTES, OCR_JPEG_QUALITY, PREVIEW_MAX_SIDE
+
+# 解码结果：已按 EXIF 方向校正的图片、原始格式、原始尺寸（宽, 高）
+DecodedImage = namedtuple("DecodedImage", "image format size")
+
+
+def base64_size(byte_count):
+    """
+    计算字节数据经 Base64 编码后的长度。
+    """
+    return (byte_count + 2) // 3 * 4
+
+
+def _encode(image, fmt, quality):
+    buffer = io.BytesIO()
+    if fmt == "JPEG":
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    else:
+        image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def decode_image(raw, max_side=OCR_MAX_SIDE):
+    """
+    解码图片并按 EXIF 方向校正。JPEG 使用 draft 模式，在解码阶段直接按 1/2、1/4、1/8 缩小到不小于 max_side
+    的最小尺寸，大尺寸照片的解码耗时和内存随之大幅下降。
+    同一次解码结果可同时用于界面预览（make_thumbnail）和 OCR 预处理（prepare_ocr_image）。
+    :param raw: 原始图片文件的字节数据
+    :param max_side: 后续使用所需的最长边像素
+    :return: DecodedImage
+    """
+    image = Image.open(io.BytesIO(raw))
+    original_format, original_size = image.format, image.size
+    if original_format == "JPEG" and max(original_size) > max_side:
+        # draft 要求宽高都不小于请求尺寸，按最长边缩放到 max_side 的比例计算请求尺寸
+        ratio = max_side / max(original_size)
+        image.draft("RGB", (max(1, int(original_size[0] * ratio)), max(1, int(original_size[1] * ratio))))
+    image = ImageOps.exif_transpose(image)
+    image.load()
+    return DecodedImage(image, original_format, original_size)
+
+
+def make_thumbnail(decoded, max_side=PREVIEW_MAX_SIDE):
+    """
+    由解码结果生成预览缩略图（不修改 decoded 中的图片）。
+    :return: PIL 图片，最长边不超过 max_side
+    """
+    thumbnail = decoded.image.copy()
+    thumbnail.thumbnail((max_side, max_side))
+    return thumbnail
+
+
+def prepare_ocr_image(raw, max_side=OCR_MAX_SIDE, max_base64_bytes=OCR_MAX_BASE64_BYTES, quality=OCR_JPEG_QUALITY,
+                      decoded=None):
+    """
+    OCR 上传前的图片预处理：按 EXIF 方向校正、限制最长边、转为灰度，并重新编码为体积较小的 JPEG/PNG。
+    若结果仍超过接口的 Base64 大小限制，则逐步降低 JPEG 质量和分辨率直到满足要求。
+    :param raw: 原始图片文件的字节数据
+    :param max_side: 最长边像素上限
+    :param max_base64_bytes: Base64 编码后的大小上限
+    :param quality: 初始 JPEG 质量
+    :param decoded: 可选的 decode_image 解码结果（如界面预览时已解码），为 None 时重新解码
+    :return: 处理后的图片字节数据；若处理结果反而比原图大且原图满足限制，则返回原图
+    """
+    if decoded is None:
+        decoded = decode_image(raw, max_side)
+    original_format, original_side = decoded.format, max(decoded.size)
+    image = decoded.image
+    if max(image.size) > max_side:
+        # thumbnail 会原地修改图片，先复制以免影响共享的解码结果
+        image = image.copy()
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    image = image.convert("L")
+
+    # 截图类图片（PNG 等无损格式）文字边缘锐利，保留 PNG 编码；照片使用 JPEG
+    fmt = "PNG" if original_format in ("PNG", "BMP", "GIF") else "JPEG"
+    data = _encode(image, fmt, quality)
+    if len(data) >= len(raw) and original_side <= max_side and base64_size(len(raw)) <= max_base64_bytes:
+        return raw
+
+    while base64_size(len(data)) > max_base64_bytes:
+        if fmt == "JPEG" and quality > 40:
+            quality -= 15
+        else:
+            fmt = "JPEG"
+            image = image.resize((max(1, image.width * 3 // 4), max(1, image.height * 3 // 4)), Image.LANCZOS)
+        data = _encode(image, fmt, quality)
+    return data
+
+
+def to_base64(data):
+    return base64.b64encode(data).decode("utf-8")
@@ -0,0 +1,105 @@
+# live_translate.py
+import asyncio
+import threading
+
+from config import LIVE_TRANSLATE_DEBOUNCE_MS
+
+
+class LiveTranslator:
+    """
+    边输入边翻译：每次编辑都提交到 AsyncTencentAIService 的同一个任务 key，新编辑会取消上一次的任务（latest-wins）。
+    - 防抖：任务先等待 debounce 时长，期间再次编辑则被取消，连续输入只在停顿后发出一次请求；
+    - 合并：相同的 (原文, 目标语言) 请求仍在进行时不再重复发出，新任务直接等待同一个结果（single-flight）；
+    - 丢弃过期结果：请求返回时原文已被再次修改，则结果不再回调。
+    只负责刷新译文，不写入历史记录。
+    """
+
+    def __init__(self, async_ai, translate=None, debounce_ms=LIVE_TRANSLATE_DEBOUNCE_MS):
+        """
+        :param async_ai: AsyncTencentAIService 实例
+        :param translate: 翻译协程函数 translate(text, target_lang)，默认为 async_ai.translate_segmented
+        :param debounce_ms: 防抖时长（毫秒）
+        """
+        self.async_ai = async_ai
+        self.translate = translate or async_ai.translate_segmented
+        self.debounce = debounce_ms / 1000
+        self._inflight = {}  # (原文, 目标语言) -> asyncio.Task，仅在事件循环线程中访问
+        self._last = None  # 最近一次回调的 (原文, 目标语言)
+        self._lock = threading.Lock()
+        self.edits = 0
+        self.requests = 0
+        self.coalesced = 0
+        self.unchanged = 0
+        self.stale = 0
+
+    def edit(self, text, target_lang, on_result):
+        """
+        原文被编辑时调用（可在任意线程中调用）。
+        :param on_result: 结果回调 on_result(译文)，在事件循环线程中调用
+        """
+        with self._lock:
+            self.edits += 1
+
+        def callback(result, error):
+            if error is not None:
+                print(f"Live Translate Error: {error}")
+            elif result is not None:
+                on_result(result)
+
+        self.async_ai.submit('live_translate', self._run(text, target_lang), callback)
+
+    def cancel(self):
+        """
+        取消等待中的防抖任务（如关闭实时翻译、手动翻译时），并清除已显示译文的记录。
+        """
+        self.async_ai.cancel('live_translate')
+        self.reset()
+
+    def reset(self):
+        """
+        译文框被其他操作改写，或切换实时翻译模式时调用：下一次编辑即使原文未变也会重新翻译并刷新译文。
+        """
+        self._last = None
+
+    async def _run(self, text, target_lang):
+        await asyncio.sleep(self.debounce)
+        key = (text, target_lang)
+        if key == self._last:
+            # 编辑后又改回了已显示译文的原文
+            self._count('unchanged')
+            return None
+        task = self._inflight.get(key)
+        if task is None:
+            self._count('requests')
+            task = asyncio.ensure_future(self.translate(text, target_lang))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._count('coalesced')
+        try:
+            # shield：本任务被新编辑取消时，进行中的请求继续执行，可供相同原文的后续任务复用
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            self._count('stale')
+            raise
+        if not result.startswith("Translate Error:"):
+            self._last = key
+        return result
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        """
+        :return: 编辑次数、实际发出的翻译请求数、被合并的请求数、未变化跳过数、过期丢弃数，以及每次编辑平均发出的请求数
+        """
+        with self._lock:
+            return {
+                'edits': self.edits,
+                'requests': self.requests,
+                'coalesced': self.coalesced,
+                'unchanged': self.unchanged,
+                'stale': self.stale,
+                'requests_per_edit': self.requests / self.edits if self.edits else 0.0,
+            }
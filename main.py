@@ -1,6 +1,22 @@
 # main.py
+import time
+
+# 记录进程启动时刻，用于统计首帧（登录界面完成绘制）耗时
+START_TIME = time.perf_counter()
+
 import tkinter as tk
 from ui_app import TranslationApp
+from metrics import metrics
+
+
+def report_first_frame():
+    """
+    主循环处理完首批绘制事件后调用，打印并记录从启动到首帧的耗时。
+    """
+    elapsed = time.perf_counter() - START_TIME
+    metrics.observe('app.first_frame', elapsed)
+    print(f"Startup: first frame in {elapsed * 1000:.0f}ms")
+
 
 if __name__ == "__main__":
     # 创建主窗口
@@ -9,5 +25,8 @@ if __name__ == "__main__":
     # 实例化应用
     app = TranslationApp(root)
 
+    # 窗口绘制完成后统计首帧耗时
+    root.after_idle(lambda: root.after(0, report_first_frame))
+
     # 进入主循环
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
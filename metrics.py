@@ -0,0 +1,221 @@
+# metrics.py
+import bisect
+import functools
+import inspect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from config import METRICS_SLOW_CALL_MS
+
+# 耗时直方图的桶上界（秒），覆盖本地缓存命中（毫秒级）到接口超时（数十秒）
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    固定桶直方图：记录次数、总和、最大值及各桶计数，分位数按桶内线性插值估算。
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个桶为 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """
+        估算分位数。
+        :param q: 0~1 之间的分位
+        """
+        if not self.count: return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+        return self.max
+
+
+class MetricsRegistry:
+    """
+    线程安全的指标注册表：按操作名记录耗时直方图、按错误类型计数，并累计负载大小
+    （图片字节数、翻译字符数、音频字节数等）。可导出为 JSON 快照或 Prometheus 文本格式。
+    """
+
+    def __init__(self, slow_call_ms=METRICS_SLOW_CALL_MS):
+        """
+        :param slow_call_ms: 慢调用阈值（毫秒），超过时打印日志；为 0 时不记录
+        """
+        self.slow_call_ms = slow_call_ms
+        self._lock = threading.Lock()
+        self._latency = {}  # op -> Histogram
+        self._errors = {}  # (op, 错误类型) -> 次数
+        self._payload = {}  # (op, 类型) -> [次数, 总量, 最大值]
+
+    def observe(self, op, seconds):
+        """
+        记录一次操作耗时。
+        """
+        with self._lock:
+            histogram = self._latency.get(op)
+            if histogram is None:
+                histogram = self._latency[op] = Histogram()
+            histogram.observe(seconds)
+        if self.slow_call_ms and seconds * 1000 >= self.slow_call_ms:
+            print(f"Slow Call: {op} took {seconds * 1000:.1f}ms")
+
+    def count_error(self, op, error_type):
+        """
+        记录一次错误。
+        :param error_type: 错误类型，如异常类名或腾讯云错误码
+        """
+        key = (op, str(error_type))
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def add_payload(self, op, kind, amount):
+        """
+        记录一次负载大小。
+        :param kind: 负载类型，如 'image_bytes'、'chars'、'audio_bytes'
+        :param amount: 本次的大小
+        """
+        key = (op, kind)
+        with self._lock:
+            entry = self._payload.setdefault(key, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += amount
+            entry[2] = max(entry[2], amount)
+
+    @contextmanager
+    def timed(self, op):
+        """
+        计时上下文：记录代码块耗时，代码块抛出异常时按异常类名计数后继续抛出。
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.count_error(op, type(e).__name__)
+            raise
+        finally:
+            self.observe(op, time.perf_counter() - start)
+
+    def snapshot(self):
+        """
+        :return: 可直接序列化为 JSON 的指标快照字典
+        """
+        with self._lock:
+            latency = {
+                op: {
+                    'count': h.count,
+                    'sum_s': h.sum,
+                    'avg_ms': h.sum / h.count * 1000 if h.count else 0.0,
+                    'max_ms': h.max * 1000,
+                    'p50_ms': h.quantile(0.5) * 1000,
+                    'p95_ms': h.quantile(0.95) * 1000,
+                    'p99_ms': h.quantile(0.99) * 1000,
+                }
+                for op, h in sorted(self._latency.items())
+            }
+            errors = {}
+            for (op, error_type), n in sorted(self._errors.items()):
+                errors.setdefault(op, {})[error_type] = n
+            payload = {}
+            for (op, kind), (n, total, largest) in sorted(self._payload.items()):
+                payload.setdefault(op, {})[kind] = {'count': n, 'total': total, 'max': largest}
+        return {'timestamp': time.time(), 'latency': latency, 'errors': errors, 'payload': payload}
+
+    def to_prometheus(self, prefix="trans_assistant"):
+        """
+        :return: Prometheus 文本格式（可供 node_exporter textfile collector 采集）
+        """
+        lines = [f"# TYPE {prefix}_operation_seconds histogram"]
+        with self._lock:
+            for op, h in sorted(self._latency.items()):
+                cumulative = 0
+                for bound, n in zip(list(h.buckets) + ["+Inf"], h.counts):
+                    cumulative += n
+                    lines.append(f'{prefix}_operation_seconds_bucket{{op="{op}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_operation_seconds_sum{{op="{op}"}} {h.sum}')
+                lines.append(f'{prefix}_operation_seconds_count{{op="{op}"}} {h.count}')
+            lines.append(f"# TYPE {prefix}_errors_total counter")
+            for (op, error_type), n in sorted(self._errors.items()):
+                lines.append(f'{prefix}_errors_total{{op="{op}",type="{error_type}"}} {n}')
+            lines.append(f"# TYPE {prefix}_payload_total counter")
+            for (op, kind), (n, total, _) in sorted(self._payload.items()):
+                lines.append(f'{prefix}_payload_total{{op="{op}",kind="{kind}"}} {total}')
+            lines.append(f"# TYPE {prefix}_payload_count counter")
+            for (op, kind), (n, total, _) in sorted(self._payload.items()):
+                lines.append(f'{prefix}_payload_count{{op="{op}",kind="{kind}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """
+        导出指标到文件：.prom 后缀写 Prometheus 文本格式，否则写 JSON 快照。
+        """
+        if path.endswith(".prom"):
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._errors.clear()
+            self._payload.clear()
+
+
+# 进程内共享的默认注册表
+metrics = MetricsRegistry()
+
+
+def instrument(op):
+    """
+    方法装饰器：记录耗时并按异常类名统计错误。生成器函数记录从开始迭代到结束（或被关闭）的总耗时。
+    :param op: 操作名，如 'tencent.ocr_image'
+    """
+
+    def decorator(func):
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                with metrics.timed(op):
+                    yield from func(*args, **kwargs)
+
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.timed(op):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_class(prefix):
+    """
+    类装饰器：为类中定义的所有公有方法加上 instrument，操作名为 '<prefix>.<方法名>'。
+    """
+
+    def decorator(cls):
+        for name, member in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(member): continue
+            setattr(cls, name, instrument(f"{prefix}.{name}")(member))
+        return cls
+
+    return decorator
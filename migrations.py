@@ -0,0 +1,258 @@
+# migrations.py
+from mysql.connector import Error
+from config import LANG_MAP
+
+# history 表预览列的长度（字符），列表查询直接读取预览列而不必访问完整的 TEXT 列
+PREVIEW_COLUMN_LEN = 60
+# 回填预览列时每批更新的行数，避免大表上的长事务
+BACKFILL_BATCH = 5000
+
+
+def ensure_index(cursor, table, index_name, ddl):
+    """
+    若索引不存在则创建（MySQL 的 CREATE INDEX 不支持 IF NOT EXISTS）。
+    :param cursor: 当前连接的游标
+    :param table: 表名
+    :param index_name: 索引名
+    :param ddl: 创建索引的 DDL 语句
+    :return: 本次是否新建了索引
+    """
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+        (table, index_name))
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(ddl)
+        return True
+    return False
+
+
+def ensure_column(cursor, table, column, ddl):
+    """
+    若列不存在则执行 DDL 添加（MySQL 的 ADD COLUMN 不支持 IF NOT EXISTS）。
+    :return: 本次是否新增了列
+    """
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s",
+        (table, column))
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(ddl)
+        return True
+    return False
+
+
+def drop_index(cursor, table, index_name):
+    """
+    若索引存在则删除。
+    """
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+        (table, index_name))
+    if cursor.fetchone()[0] > 0:
+        cursor.execute(f"DROP INDEX {index_name} ON {table}")
+
+
+def create_base_tables(conn, cursor):
+    # 创建用户表：存储用户名和密码
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS users
+                   (
+                       id
+                       INT
+                       AUTO_INCREMENT
+                       PRIMARY
+                       KEY,
+                       username
+                       VARCHAR
+                   (
+                       255
+                   ) UNIQUE NOT NULL,
+                       password VARCHAR
+                   (
+                       255
+                   ) NOT NULL
+                       )
+                   """)
+    # 创建历史记录表：存储原文、译文、目标语言及关联的用户 ID
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS history
+                   (
+                       id
+                       INT
+                       AUTO_INCREMENT
+                       PRIMARY
+                       KEY,
+                       user_id
+                       INT,
+                       original_text
+                       TEXT,
+                       translated_text
+                       TEXT,
+                       target_lang
+                       VARCHAR
+                   (
+                       10
+                   ),
+                       created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                       FOREIGN KEY
+                   (
+                       user_id
+                   ) REFERENCES users
+                   (
+                       id
+                   )
+                       )
+                   """)
+
+
+def create_translation_cache(conn, cursor):
+    # 创建翻译缓存表：按“原文 + 源语言 + 目标语言”的哈希保存译文，供所有用户共享
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS translation_cache
+                   (
+                       cache_key CHAR(64) PRIMARY KEY,
+                       source_lang VARCHAR(10),
+                       target_lang VARCHAR(10),
+                       translated_text TEXT,
+                       created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                   )
+                   """)
+
+
+def create_history_archive(conn, cursor):
+    # 创建历史归档表：超过保留期的记录压缩后移入此表，保持 history 表精简
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS history_archive
+                   (
+                       id INT PRIMARY KEY,
+                       user_id INT,
+                       target_lang VARCHAR(10),
+                       created_at TIMESTAMP NULL,
+                       archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                       payload MEDIUMBLOB,
+                       INDEX idx_archive_user_created (user_id, created_at)
+                   )
+                   """)
+
+
+def index_history_user_created(conn, cursor):
+    # 为历史记录分页查询创建组合索引，使按时间倒序的游标分页无需文件排序
+    ensure_index(cursor, "history", "idx_history_user_created",
+                 "CREATE INDEX idx_history_user_created ON history (user_id, created_at, id)")
+
+
+def add_history_fulltext(conn, cursor):
+    # 创建基于 ngram 解析器的全文索引，用于中日韩文本检索；不支持时跳过，检索退回本地倒排索引
+    try:
+        ensure_index(cursor, "history", "ft_history_text",
+                     "ALTER TABLE history ADD FULLTEXT INDEX ft_history_text "
+                     "(original_text, translated_text) WITH PARSER ngram")
+    except Error as err:
+        print(f"FULLTEXT index unavailable, using local search index: {err}")
+
+
+def index_users_login(conn, cursor):
+    # 登录按 (username, password) 查询并只取 id：组合索引（InnoDB 二级索引自带主键）即可覆盖该查询
+    ensure_index(cursor, "users", "idx_users_login", "CREATE INDEX idx_users_login ON users (username, password)")
+
+
+def add_history_previews(conn, cursor):
+    # 新增原文/译文预览列并按主键范围分批回填，列表查询只需读取这两个短列
+    ensure_column(cursor, "history", "original_preview",
+                  f"ALTER TABLE history ADD COLUMN original_preview VARCHAR({PREVIEW_COLUMN_LEN}) NOT NULL DEFAULT ''")
+    ensure_column(cursor, "history", "translated_preview",
+                  f"ALTER TABLE history ADD COLUMN translated_preview VARCHAR({PREVIEW_COLUMN_LEN}) NOT NULL DEFAULT ''")
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM history")
+    max_id = cursor.fetchone()[0]
+    for start in range(0, max_id, BACKFILL_BATCH):
+        cursor.execute(
+            "UPDATE history SET original_preview = COALESCE(LEFT(original_text, %s), ''), "
+            "translated_preview = COALESCE(LEFT(translated_text, %s), '') WHERE id > %s AND id <= %s",
+            (PREVIEW_COLUMN_LEN, PREVIEW_COLUMN_LEN, start, start + BACKFILL_BATCH))
+        conn.commit()
+
+
+def store_language_codes(conn, cursor):
+    # target_lang 由界面显示名称（如“英语”）改为语言代码（如 en），列改为单字节 ASCII 字符集
+    cases = " ".join("WHEN %s THEN %s" for _ in LANG_MAP)
+    params = [value for item in LANG_MAP.items() for value in item]
+    names = list(LANG_MAP)
+    placeholders = ", ".join(["%s"] * len(names))
+    for table in ("history", "history_archive"):
+        cursor.execute(f"UPDATE {table} SET target_lang = CASE target_lang {cases} END "
+                       f"WHERE target_lang IN ({placeholders})", (*params, *names))
+        cursor.execute(f"ALTER TABLE {table} MODIFY target_lang VARCHAR(10) CHARACTER SET ascii")
+
+
+def index_history_list(conn, cursor):
+    # 历史列表的覆盖索引：按用户过滤、按时间倒序翻页，所需列全部来自索引，无需回表读取 TEXT 列。
+    # 原 (user_id, created_at, id) 索引是它的前缀，随后删除
+    ensure_index(cursor, "history", "idx_history_list",
+                 "CREATE INDEX idx_history_list ON history "
+                 "(user_id, created_at, id, target_lang, original_preview, translated_preview)")
+    drop_index(cursor, "history", "idx_history_user_created")
+
+
+# 按版本号顺序执行的迁移：(版本号, 说明, 迁移函数 step(conn, cursor))。已发布的迁移不要修改，新的表结构变更追加在末尾。
+# 每个迁移函数都需可重复执行，已由旧版本 init_db 建好表结构的数据库首次迁移时会全部重新执行一遍。
+MIGRATIONS = [
+    (1, "create users and history tables", create_base_tables),
+    (2, "create translation_cache table", create_translation_cache),
+    (3, "create history_archive table", create_history_archive),
+    (4, "index history (user_id, created_at, id)", index_history_user_created),
+    (5, "add ngram FULLTEXT index on history text", add_history_fulltext),
+    (6, "add covering login index on users", index_users_login),
+    (7, "add preview columns to history", add_history_previews),
+    (8, "store target_lang as language codes", store_language_codes),
+    (9, "add covering index for history list", index_history_list),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(cursor):
+    """
+    查询数据库已应用的最新迁移版本。
+    :return: 版本号；尚未建立 schema_migrations 表时返回 None
+    """
+    try:
+        cursor.execute("SELECT MAX(version) FROM schema_migrations")
+    except Error:
+        return None
+    row = cursor.fetchone()
+    return (row[0] or 0) if row else 0
+
+
+def migrate(conn):
+    """
+    执行尚未应用的迁移。表结构已是最新版本时只需一次版本查询，不执行任何 DDL。
+    :param conn: 数据库连接
+    :return: (迁移前版本, 迁移后版本)
+    """
+    cursor = conn.cursor()
+    version = current_version(cursor)
+    if version == SCHEMA_VERSION:
+        return version, version
+    if version is None:
+        conn.rollback()
+        cursor.execute("""
+                       CREATE TABLE IF NOT EXISTS schema_migrations
+                       (
+                           version INT PRIMARY KEY,
+                           description VARCHAR(255),
+                           applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                       )
+                       """)
+        version = 0
+    start = version
+    for number, description, step in MIGRATIONS:
+        if number <= version: continue
+        step(conn, cursor)
+        # 多个程序实例同时启动时可能重复迁移，迁移本身可重复执行，记录时忽略重复
+        cursor.execute("INSERT IGNORE INTO schema_migrations (version, description) VALUES (%s, %s)",
+                       (number, description))
+        conn.commit()
+        version = number
+        print(f"Schema Migration: applied {number} ({description})")
+    return start, version
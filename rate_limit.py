@@ -0,0 +1,82 @@
+# rate_limit.py
+import random
+import threading
+import time
+from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
+
+# 可重试的错误码前缀：接口限频、服务端内部错误及网络错误
+RETRYABLE_ERROR_PREFIXES = ("RequestLimitExceeded", "InternalError", "ClientNetworkError", "ServerNetworkError",
+                            "ResourceUnavailable")
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶限流器：按 rate 个/秒匀速补充令牌，最多积攒 capacity 个。
+    获取不到令牌时阻塞等待，而不是直接失败。
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        :param rate: 每秒补充的令牌数（即允许的 QPS）
+        :param capacity: 桶容量（允许的突发请求数），默认与 rate 相同
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {'acquired': 0, 'waited': 0, 'wait_time_total': 0.0, 'wait_time_max': 0.0}
+
+    def acquire(self, tokens=1):
+        """
+        获取令牌，不足时阻塞直到补充完成。
+        :param tokens: 需要的令牌数
+        :return: 本次等待的秒数
+        """
+        start = time.monotonic()
+        slept = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    waited = now - start if slept else 0.0
+                    self._stats['acquired'] += 1
+                    if slept:
+                        self._stats['waited'] += 1
+                        self._stats['wait_time_total'] += waited
+                        self._stats['wait_time_max'] = max(self._stats['wait_time_max'], waited)
+                    return waited
+                shortfall = (tokens - self._tokens) / self.rate
+            # 在锁外休眠，醒来后重新竞争令牌
+            time.sleep(shortfall)
+            slept = True
+
+    def stats(self):
+        """
+        :return: 包含 rate、获取次数、需要等待的次数及累计/最大等待时间的字典
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['rate'] = self.rate
+        acquired = snapshot['acquired']
+        snapshot['wait_time_avg'] = snapshot['wait_time_total'] / acquired if acquired else 0.0
+        return snapshot
+
+
+def is_retryable(err):
+    """
+    判断腾讯云 SDK 异常是否为限频或临时性错误。
+    """
+    code = err.get_code() if isinstance(err, TencentCloudSDKException) else None
+    return bool(code) and code.startswith(RETRYABLE_ERROR_PREFIXES)
+
+
+def backoff_delay(attempt, base, maximum):
+    """
+    计算带抖动的指数退避时间（full jitter）：在 [0, min(maximum, base * 2^attempt)] 内随机取值。
+    :param attempt: 已失败的次数（从 0 开始）
+    """
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
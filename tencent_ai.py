@@ -1,62 +1,195 @@
 # tencent_ai.py
 import base64
+import importlib
 import time
 import hashlib
-import os
-import tempfile
-from tencentcloud.common import credential
-from tencentcloud.common.profile.client_profile import ClientProfile
-from tencentcloud.common.profile.http_profile import HttpProfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
-from tencentcloud.ocr.v20181119 import ocr_client, models as ocr_models
-from tencentcloud.tmt.v20180321 import tmt_client, models as tmt_models
-from tencentcloud.tts.v20190823 import tts_client, models as tts_models
-from config import TENCENT_SECRET_ID, TENCENT_SECRET_KEY, REGION
+from config import TENCENT_SECRET_ID, TENCENT_SECRET_KEY, REGION, TMT_BATCH_MAX_CHARS, TMT_BATCH_MAX_ITEMS, \
+    TMT_MAX_WORKERS, TTS_MAX_CHARS, TTS_MAX_WORKERS, TENCENT_HTTP_SCHEME, TENCENT_OCR_ENDPOINT, TENCENT_TMT_ENDPOINT, \
+    TENCENT_TTS_ENDPOINT, TENCENT_CONNECT_TIMEOUT, TENCENT_READ_TIMEOUT, OCR_CACHE_SIZE, OCR_QPS, TMT_QPS, \
+    TTS_QPS, API_MAX_RETRIES, API_BACKOFF_BASE, API_BACKOFF_MAX
+from audio_cache import AudioCache
+from translation_cache import LRUCache
+from rate_limit import TokenBucket, is_retryable, backoff_delay
+from text_segment import segment_text, unique_segments, pack_batches, rebuild_text, merge_small, word_separator
+from metrics import metrics, instrument_class
 
+# 各服务的 SDK 模块路径（相对 tencentcloud 包）与客户端类名
+SDK_MODULES = {
+    'ocr': ("ocr.v20181119", "OcrClient"),
+    'tmt': ("tmt.v20180321", "TmtClient"),
+    'tts': ("tts.v20190823", "TtsClient"),
+}
 
+
+def sdk_models(service):
+    """
+    按需导入指定服务的 SDK models 模块。各服务的 models 及其依赖的 HTTP 库体积较大，
+    推迟到首次调用对应接口时再加载，缩短程序启动时间。
+    """
+    return importlib.import_module(f"tencentcloud.{SDK_MODULES[service][0]}.models")
+
+
+@instrument_class("tencent")
 class TencentAIService:
     """
     腾讯云 AI 服务类：封装了 OCR 文字识别、机器翻译 (MT) 和 语音合成 (TTS) 的相关接口。
     """
 
-    def __init__(self):
+    def __init__(self, cache=None, audio_cache=None, memory=None):
         """
         初始化方法：使用 config.py 中的密钥和地域信息配置腾讯云认证对象及客户端配置。
+        :param cache: 可选的 TranslationCache 翻译缓存，命中时不再调用翻译接口
+        :param audio_cache: 可选的 AudioCache 语音缓存，默认使用 config.py 中配置的缓存目录
+        :param memory: 可选的 TranslationMemory 翻译记忆，缓存未命中时复用相似的历史译文
+        """
+        self.cache = cache
+        self.memory = memory
+        # 语音缓存在首次使用时创建：加载索引需要扫描缓存目录，不应阻塞界面启动
+        self._audio_cache = audio_cache
+        self._audio_cache_lock = threading.Lock()
+        # OCR 结果缓存：键为原图内容的 SHA-256
+        self.ocr_cache = LRUCache(OCR_CACHE_SIZE)
+        # 身份认证对象与各服务的长连接客户端均在首次使用时创建，并在之后的调用中复用
+        self.cred = None
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        # 各服务的令牌桶限流器，由所有调用线程共享
+        self.limiters = {
+            'ocr': TokenBucket(OCR_QPS),
+            'tmt': TokenBucket(TMT_QPS),
+            'tts': TokenBucket(TTS_QPS),
+        }
+
+    @property
+    def audio_cache(self):
+        """
+        语音缓存（懒加载，线程安全）：未传入时在首次访问时按 config.py 中配置的缓存目录创建。
+        """
+        if self._audio_cache is None:
+            with self._audio_cache_lock:
+                if self._audio_cache is None:
+                    self._audio_cache = AudioCache()
+        return self._audio_cache
+
+    def _get_client(self, service):
+        """
+        获取指定服务的共享客户端（懒加载，线程安全）。
+        客户端内部持有 HTTP 会话并开启 keep-alive，复用后省去每次请求的对象构造和 TLS 握手。
+        :param service: 服务名，'ocr'、'tmt' 或 'tts'
+        :return: 对应的 SDK 客户端对象
+        """
+        client = self._clients.get(service)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(service)
+                if client is None:
+                    client = self._create_client(service)
+                    self._clients[service] = client
+        return client
+
+    def _create_client(self, service):
         """
-        # 初始化身份认证对象
-        self.cred = credential.Credential(TENCENT_SECRET_ID, TENCENT_SECRET_KEY)
-        # 配置 HTTP 选项（设置 OCR 服务域名）
-        self.httpProfile = HttpProfile()
-        self.httpProfile.endpoint = "ocr.tencentcloudapi.com"
+        按服务创建 SDK 客户端：每个服务使用独立的 HttpProfile（域名、超时、keep-alive）。
+        """
+        from tencentcloud.common import credential
+        from tencentcloud.common.profile.client_profile import ClientProfile
+        from tencentcloud.common.profile.http_profile import HttpProfile
+
+        if self.cred is None:
+            self.cred = credential.Credential(TENCENT_SECRET_ID, TENCENT_SECRET_KEY)
+        module, class_name = SDK_MODULES[service]
+        client_module = importlib.import_module(f"tencentcloud.{module}.{service}_client")
+        endpoint = {'ocr': TENCENT_OCR_ENDPOINT, 'tmt': TENCENT_TMT_ENDPOINT, 'tts': TENCENT_TTS_ENDPOINT}[service]
+        # 配置 HTTP 选项：reqTimeout 直接传给 requests，使用 (连接超时, 读取超时) 二元组
+        http_profile = HttpProfile(protocol=TENCENT_HTTP_SCHEME, endpoint=endpoint,
+                                   reqTimeout=(TENCENT_CONNECT_TIMEOUT, TENCENT_READ_TIMEOUT), keepAlive=True)
         # 配置客户端通用属性
-        self.clientProfile = ClientProfile()
-        self.clientProfile.httpProfile = self.httpProfile
+        client_profile = ClientProfile(httpProfile=http_profile)
+        return getattr(client_module, class_name)(self.cred, REGION, client_profile)
 
-    def ocr_image(self, image_path):
+    def _call(self, service, action, req):
+        """
+        统一的接口调用入口：先从该服务的令牌桶获取令牌（不足时等待），
+        遇到限频或临时性错误时按带抖动的指数退避重试。
+        :param service: 服务名，'ocr'、'tmt' 或 'tts'
+        :param action: 接口名，如 'TextTranslate'
+        :param req: 请求对象
+        :return: 接口响应对象
+        :raises TencentCloudSDKException: 不可重试的错误，或重试次数用尽
+        """
+        client = self._get_client(service)
+        op = f"tencent.api.{action}"
+        attempt = 0
+        while True:
+            self.limiters[service].acquire()
+            start = time.perf_counter()
+            try:
+                return getattr(client, action)(req)
+            except TencentCloudSDKException as err:
+                # 按腾讯云错误码统计，每次重试单独计数
+                metrics.count_error(op, err.get_code())
+                error = err
+            finally:
+                metrics.observe(op, time.perf_counter() - start)
+            if attempt >= API_MAX_RETRIES or not is_retryable(error):
+                raise error
+            delay = backoff_delay(attempt, API_BACKOFF_BASE, API_BACKOFF_MAX)
+            print(f"{action} retry {attempt + 1}/{API_MAX_RETRIES} in {delay:.2f}s: {error.get_code()}")
+            time.sleep(delay)
+            attempt += 1
+
+    def ocr_image(self, image_path, raw=None, decoded=None):
         """
         图片文字识别 (OCR)。
+        上传前先对图片做缩放、灰度化和重新编码以减小请求体；识别结果按原图内容的 SHA-256 缓存，
+        同一张图片再次上传时直接返回，不再调用接口。
         :param image_path: 本地图片文件的路径
+        :param raw: 可选的图片文件内容（调用方已读取时传入，避免重复读盘）
+        :param decoded: 可选的 image_utils.decode_image 解码结果，与界面预览共用一次解码
         :return: 识别出的文字内容（多行文本），若失败则返回错误信息字符串。
         """
+        if raw is None:
+            try:
+                with open(image_path, "rb") as f:
+                    raw = f.read()
+            except OSError as e:
+                return f"OCR Error: {e}"
+
+        # 按图片内容哈希查询缓存
+        image_hash = hashlib.sha256(raw).hexdigest()
+        cached = self.ocr_cache.get(image_hash)
+        if cached is not None:
+            return cached
+
         try:
-            # 读取图片并转换为 Base64 编码
-            with open(image_path, "rb") as f:
-                base64_data = base64.b64encode(f.read()).decode("utf-8")
+            # 预处理图片并转换为 Base64 编码；无法解码的格式退回上传原图
+            from image_utils import prepare_ocr_image, to_base64
+            try:
+                data = prepare_ocr_image(raw, decoded=decoded)
+            except Exception as e:
+                print(f"OCR Preprocess Warning: {e}")
+                data = raw
+            base64_data = to_base64(data)
+            metrics.add_payload('tencent.ocr_image', 'image_bytes', len(raw))
+            metrics.add_payload('tencent.ocr_image', 'upload_bytes', len(base64_data))
 
-            # 实例化 OCR 客户端对象
-            client = ocr_client.OcrClient(self.cred, REGION, self.clientProfile)
             # 构造高精度 OCR 请求
-            req = ocr_models.GeneralAccurateOCRRequest()
+            req = sdk_models('ocr').GeneralAccurateOCRRequest()
             req.ImageBase64 = base64_data
 
-            # 调用接口获取响应
-            resp = client.GeneralAccurateOCR(req)
+            # 调用接口获取响应（经限流与重试）
+            resp = self._call('ocr', 'GeneralAccurateOCR', req)
 
             # 提取所有检测到的文本行
             text_results = []
             for detection in resp.TextDetections:
                 text_results.append(detection.DetectedText)
-            return "\n".join(text_results)
+            result = "\n".join(text_results)
+            self.ocr_cache.put(image_hash, result)
+            return result
         except TencentCloudSDKException as err:
             # 捕获腾讯云 SDK 异常
             return f"OCR Error: {err}"
@@ -69,77 +202,347 @@ class TencentAIService:
         :param source_lang: 源语言代码，默认为 'auto' (自动识别)
         :return: 翻译后的目标文本，若失败则返回错误提示。
         """
+        # 优先查询翻译缓存，其次查询翻译记忆
+        cached = self._lookup(text, target_lang, source_lang)
+        if cached is not None:
+            return cached
         try:
-            # 实例化翻译客户端
-            client = tmt_client.TmtClient(self.cred, REGION)
             # 构造翻译请求
-            req = tmt_models.TextTranslateRequest()
+            req = sdk_models('tmt').TextTranslateRequest()
             req.SourceText = text
             req.Source = source_lang
             req.Target = target_lang
             req.ProjectId = 0  # 默认项目 ID
+            metrics.add_payload('tencent.translate_text', 'chars', len(text))
 
             # 执行翻译
-            resp = client.TextTranslate(req)
+            resp = self._call('tmt', 'TextTranslate', req)
+            # 仅缓存成功的翻译结果，错误信息不会进入缓存
+            self._remember(text, target_lang, source_lang, resp.TargetText)
             return resp.TargetText
         except TencentCloudSDKException as err:
             return f"Translate Error: {err}"
 
+    def translate_segmented(self, text, target_lang, source_lang='auto'):
+        """
+        分段批量翻译：适用于 OCR 输出等多行或超长文本。
+        将原文按行（超长行再按句）切分，去除重复片段后打包为多个 TextTranslateBatch 请求并发执行，
+        最后按原有版式拼回译文。单行短文本直接走 translate_text。
+        :param text: 待翻译的原文
+        :param target_lang: 目标语言代码
+        :param source_lang: 源语言代码，默认为 'auto' (自动识别)
+        :return: 保持原有换行结构的译文，若失败则返回错误提示。
+        """
+        layout = segment_text(text, TMT_BATCH_MAX_CHARS)
+        segments = unique_segments(layout)
+        if len(layout) == 1 and len(layout[0]) == 1:
+            return self.translate_text(text, target_lang, source_lang)
+
+        # 已缓存或可由翻译记忆复用的片段无需再次请求
+        translations = {}
+        pending = []
+        for segment in segments:
+            cached = self._lookup(segment, target_lang, source_lang)
+            if cached is not None:
+                translations[segment] = cached
+            else:
+                pending.append(segment)
+
+        try:
+            self._translate_pending(pending, target_lang, source_lang, translations)
+        except TencentCloudSDKException as err:
+            return f"Translate Error: {err}"
+        return rebuild_text(layout, translations, word_separator(target_lang))
+
+    def detect_language(self, text):
+        """
+        语种识别：调用 LanguageDetect 接口识别原文语言（只取前 TMT_BATCH_MAX_CHARS 个字符）。
+        :param text: 待识别的文本
+        :return: 语言代码（如 'zh'），识别失败时返回 'auto'
+        """
+        try:
+            req = sdk_models('tmt').LanguageDetectRequest()
+            req.Text = text[:TMT_BATCH_MAX_CHARS]
+            req.ProjectId = 0
+            return self._call('tmt', 'LanguageDetect', req).Lang or 'auto'
+        except TencentCloudSDKException as err:
+            print(f"Language Detect Error: {err}")
+            return 'auto'
+
+    def translate_fanout(self, text, target_langs, source_lang='auto'):
+        """
+        多目标语言翻译：先识别一次源语言，再并发翻译为各目标语言（仍受翻译接口的令牌桶限流），
+        每种语言一完成就产出结果，总耗时接近最慢的单个翻译而不是各语言耗时之和。
+        与源语言相同的目标语言直接返回原文，不调用翻译接口。
+        :param text: 待翻译的原文
+        :param target_langs: 目标语言代码列表
+        :param source_lang: 源语言代码，为 'auto' 时先调用一次语种识别
+        :return: 生成器，按完成顺序产出 (目标语言代码, 译文或错误提示)
+        """
+        if source_lang == 'auto':
+            source_lang = self.detect_language(text)
+        target_langs = list(dict.fromkeys(target_langs))
+        if source_lang in target_langs:
+            yield source_lang, text
+        pending = [lang for lang in target_langs if lang != source_lang]
+        if not pending:
+            return
+        # 目标语言数量有限，每种语言一个线程同时发出；请求速率由翻译接口的令牌桶控制
+        pool = ThreadPoolExecutor(max_workers=len(pending))
+        futures = {pool.submit(self.translate_segmented, text, lang, source_lang): lang for lang in pending}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # 调用方提前停止迭代时取消尚未开始的翻译
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    def translate_incremental(self, text, target_lang, previous=None, source_lang='auto'):
+        """
+        增量翻译：适用于修改原文后重新翻译。原文按句切分，与上一版本的片段比对，
+        只翻译新增或修改过的句子（合并为一次批量请求），未变化的句子直接沿用上一版本的译文。
+        :param text: 修改后的原文
+        :param target_lang: 目标语言代码
+        :param previous: 上一次调用返回的 {片段: 译文} 映射，需为同一目标语言；为 None 时翻译全部片段
+        :param source_lang: 源语言代码，默认为 'auto' (自动识别)
+        :return: (保持原有换行结构的译文, 本次原文的 {片段: 译文} 映射)；失败时译文为错误提示，映射为 None
+        """
+        previous = previous or {}
+        layout = segment_text(text, TMT_BATCH_MAX_CHARS, by_sentence=True)
+        translations = {}
+        pending = []
+        for segment in unique_segments(layout):
+            cached = previous.get(segment)
+            if cached is None:
+                cached = self._lookup(segment, target_lang, source_lang)
+            if cached is not None:
+                translations[segment] = cached
+            else:
+                pending.append(segment)
+        metrics.add_payload('tencent.translate_incremental', 'reused_segments', len(translations))
+        metrics.add_payload('tencent.translate_incremental', 'changed_segments', len(pending))
+
+        try:
+            self._translate_pending(pending, target_lang, source_lang, translations)
+        except TencentCloudSDKException as err:
+            return f"Translate Error: {err}", None
+        return rebuild_text(layout, translations, word_separator(target_lang)), translations
+
+    def _translate_pending(self, pending, target_lang, source_lang, translations):
+        """
+        将待翻译的片段打包为多个批量请求并发执行，译文写入 translations。
+        :param pending: 待翻译的片段列表
+        :param translations: {片段: 译文} 映射，原地更新
+        :raises TencentCloudSDKException: 任一批次调用失败
+        """
+        batches = pack_batches(pending, TMT_BATCH_MAX_CHARS, TMT_BATCH_MAX_ITEMS)
+        if not batches:
+            return
+        with ThreadPoolExecutor(max_workers=min(TMT_MAX_WORKERS, len(batches))) as pool:
+            results = list(pool.map(lambda b: self._translate_batch(b, target_lang, source_lang), batches))
+        for batch, result in zip(batches, results):
+            translations.update(zip(batch, result))
+
+    def _translate_batch(self, segments, target_lang, source_lang):
+        """
+        调用批量翻译接口翻译一批片段，并将结果写入缓存。
+        :param segments: 片段列表（总长度需在单次请求限制内）
+        :return: 与 segments 一一对应的译文列表
+        :raises TencentCloudSDKException: 接口调用失败
+        """
+        req = sdk_models('tmt').TextTranslateBatchRequest()
+        req.SourceTextList = segments
+        req.Source = source_lang
+        req.Target = target_lang
+        req.ProjectId = 0
+        metrics.add_payload('tencent.translate_batch', 'chars', sum(len(segment) for segment in segments))
+        resp = self._call('tmt', 'TextTranslateBatch', req)
+        for segment, translated in zip(segments, resp.TargetTextList):
+            self._remember(segment, target_lang, source_lang, translated)
+        return resp.TargetTextList
+
+    def _lookup(self, text, target_lang, source_lang):
+        """
+        依次查询翻译缓存和翻译记忆。
+        :return: 可直接使用的译文，均未命中时返回 None
+        """
+        if self.cache is not None:
+            cached = self.cache.get(text, source_lang, target_lang)
+            if cached is not None:
+                return cached
+        if self.memory is not None:
+            return self.memory.reuse(text, target_lang)
+        return None
+
+    def _remember(self, text, target_lang, source_lang, translated):
+        """
+        将接口返回的译文写入翻译缓存和翻译记忆。
+        """
+        if self.cache is not None:
+            self.cache.put(text, source_lang, target_lang, translated)
+        if self.memory is not None:
+            self.memory.add(text, translated, target_lang)
+
     def text_to_speech(self, text, voice_type):
         """
         语音合成 (TTS) - 重构版。
         功能优化：
-        1. 使用 MD5 哈希生成文件名，避免重复请求和文件锁冲突。
-        2. 使用系统临时目录存储音频，避免污染项目目录。
-        3. 100 字符长度截断，适配免费非长文本 API 的请求长度要求。
+        1. 使用 MD5 哈希作为缓存键，避免重复请求和文件锁冲突。
+        2. 音频存入独立的 AudioCache 缓存目录（原子写入 + LRU 字节预算淘汰），避免污染项目目录。
+        3. 超出 TTS_MAX_CHARS 的部分截断，适配免费非长文本 API 的请求长度要求（长文本请使用 text_to_speech_chunks）。
 
         :param text: 待转语音的文本内容
         :param voice_type: 音色 ID
         :return: 生成的 MP3 文件路径，若失败则返回 None。
         """
         try:
-            # 腾讯云免费 TTS 接口单次请求不支持长文本
-            # 为了防止 'TextTooLong' 异常，此处强制截断前 100 个字符
-            if len(text) > 100:
-                print(f"Warning: Text length ({len(text)}) exceeds limit, truncating to 100 chars.")
-                text = text[:100]
-
-            # 生成唯一的哈希文件名 (基于文本内容和音色)
-            # 这样相同的文本和音色组合不会重复调用 API，且不会导致文件写入锁死
-            hash_str = f"{text}_{voice_type}"
-            file_hash = hashlib.md5(hash_str.encode('utf-8')).hexdigest()
-
-            # 使用系统临时目录
-            temp_dir = tempfile.gettempdir()
-            file_name = f"tts_{file_hash}.mp3"
-            file_path = os.path.join(temp_dir, file_name)
-
-            # 检查缓存：如果文件已存在，直接返回路径（防抖动 + 节省额度 + 避免写入冲突）
-            if os.path.exists(file_path):
+            text = self._tts_text(text)
+            # 生成唯一的哈希缓存键 (基于文本内容和音色)
+            # 这样相同的文本和音色组合不会重复调用 API
+            file_hash = self._tts_key(text, voice_type)
+
+            # 检查缓存：命中时直接返回路径（防抖动 + 节省额度）
+            file_path = self.audio_cache.get_path(file_hash)
+            if file_path:
                 print(f"TTS Cache Hit: {file_path}")
                 return file_path
+            return self._synthesize(text, voice_type, file_hash)[0]
 
-            # 实例化 TTS 客户端 (仅在缓存未命中时执行)
-            client = tts_client.TtsClient(self.cred, REGION)
-            req = tts_models.TextToVoiceRequest()
-            req.Text = text
-            req.SessionId = str(int(time.time()))
-            req.VoiceType = voice_type
-            req.ModelType = 1
-            req.Codec = "mp3"
-
-            # 获取响应并写入临时文件
-            resp = client.TextToVoice(req)
-            if resp.Audio:
-                audio_data = base64.b64decode(resp.Audio)
-                with open(file_path, "wb") as f:
-                    f.write(audio_data)
-                return file_path
+        except TencentCloudSDKException as err:
+            print(f"TTS Error: {err}")
+            return None
+        except Exception as e:
+            print(f"System Error: {e}")
             return None
 
+    def text_to_speech_data(self, text, voice_type):
+        """
+        语音合成并返回音频数据，供播放器直接从内存加载（优先取自语音缓存的内存层，无需读盘）。
+        缓存未命中时直接使用接口返回的音频数据，不依赖写入后的缓存（可能已被并发写入淘汰）。
+        :param text: 待转语音的文本内容（超出 TTS_MAX_CHARS 的部分截断）
+        :param voice_type: 音色 ID
+        :return: MP3 音频字节数据，若失败则返回 None。
+        """
+        try:
+            text = self._tts_text(text)
+            file_hash = self._tts_key(text, voice_type)
+            data = self.audio_cache.get_bytes(file_hash)
+            if data is not None:
+                return data
+            return self._synthesize(text, voice_type, file_hash)[1]
         except TencentCloudSDKException as err:
             print(f"TTS Error: {err}")
             return None
         except Exception as e:
             print(f"System Error: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def _tts_text(text):
+        # 腾讯云免费 TTS 接口单次请求不支持长文本
+        # 为了防止 'TextTooLong' 异常，此处强制截断前 TTS_MAX_CHARS 个字符
+        if len(text) > TTS_MAX_CHARS:
+            print(f"Warning: Text length ({len(text)}) exceeds limit, truncating to {TTS_MAX_CHARS} chars.")
+            text = text[:TTS_MAX_CHARS]
+        return text
+
+    def _synthesize(self, text, voice_type, file_hash):
+        """
+        调用 TextToVoice 接口合成音频并写入语音缓存（仅在缓存未命中时调用）。
+        :return: (MP3 文件路径, 音频数据)，接口未返回音频时为 (None, None)
+        :raises TencentCloudSDKException: 接口调用失败
+        """
+        req = sdk_models('tts').TextToVoiceRequest()
+        req.Text = text
+        req.SessionId = str(int(time.time()))
+        req.VoiceType = voice_type
+        req.ModelType = 1
+        req.Codec = "mp3"
+        metrics.add_payload('tencent.text_to_speech', 'chars', len(text))
+
+        resp = self._call('tts', 'TextToVoice', req)
+        if not resp.Audio:
+            return None, None
+        audio_data = base64.b64decode(resp.Audio)
+        metrics.add_payload('tencent.text_to_speech', 'audio_bytes', len(audio_data))
+        # 先写临时文件再原子重命名，并发写入不会产生半截文件
+        return self.audio_cache.put(file_hash, audio_data), audio_data
+
+    @staticmethod
+    def _tts_key(text, voice_type):
+        return hashlib.md5(f"{text}_{voice_type}".encode('utf-8')).hexdigest()
+
+    def split_for_tts(self, text):
+        """
+        将长文本在句末标点处切分为不超过 TTS_MAX_CHARS 的分片，并合并过短的相邻分片以减少请求次数。
+        :param text: 待转语音的文本
+        :return: 分片列表（已去除空白分片）
+        """
+        pieces = []
+        for line in segment_text(text, TTS_MAX_CHARS, by_sentence=True):
+            # 保留行尾换行，合并跨行分片时不会把两行文字粘连在一起
+            pieces.extend(line[:-1] + [line[-1] + "\n"])
+        chunks = (chunk.strip() for chunk in merge_small(pieces, TTS_MAX_CHARS))
+        return [chunk for chunk in chunks if chunk]
+
+    def text_to_speech_chunks(self, text, voice_type, as_bytes=False):
+        """
+        长文本语音合成：切分后由有界线程池并发合成各分片，并按原文顺序逐个产出音频文件路径，
+        调用方拿到第一个分片即可开始播放，后续分片仍在后台合成。
+        每个分片单独调用 text_to_speech，因此复用其 MD5 文件缓存，重复的句子不会重复请求。
+        :param text: 待转语音的文本内容
+        :param voice_type: 音色 ID
+        :param as_bytes: 为 True 时产出音频数据（text_to_speech_data）而不是文件路径
+        :return: 生成器，按顺序产出每个分片的 MP3 文件路径或音频数据（该分片合成失败时为 None）
+        """
+        chunks = self.split_for_tts(text)
+        if not chunks:
+            return
+        synthesize = self.text_to_speech_data if as_bytes else self.text_to_speech
+        pool = ThreadPoolExecutor(max_workers=min(TTS_MAX_WORKERS, len(chunks)))
+        futures = [pool.submit(synthesize, chunk, voice_type) for chunk in chunks]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # 调用方提前停止迭代（如播放被新请求打断）时取消尚未开始的分片
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    def cache_stats(self):
+        """
+        获取翻译缓存的命中统计。
+        :return: 统计信息字典，未启用缓存时返回 None。
+        """
+        return self.cache.stats() if self.cache is not None else None
+
+    def memory_stats(self):
+        """
+        获取翻译记忆的命中率及省去的翻译量。
+        :return: 统计信息字典，未启用翻译记忆时返回 None。
+        """
+        return self.memory.stats() if self.memory is not None else None
+
+    def close(self):
+        """
+        程序退出时调用：将语音缓存尚未落盘的索引写入磁盘（从未使用过语音缓存时不会为此加载索引）。
+        """
+        if self._audio_cache is not None:
+            self._audio_cache.close()
+
+    def tts_cache_stats(self):
+        """
+        获取语音缓存的命中、淘汰统计。
+        :return: 统计信息字典
+        """
+        return self.audio_cache.stats()
+
+    def limiter_stats(self):
+        """
+        获取各服务限流器的等待统计，用于评估配额是否够用。
+        :return: {服务名: 统计信息字典}
+        """
+        return {service: limiter.stats() for service, limiter in self.limiters.items()}
\ No newline at end of file
@@ -0,0 +1,38 @@
+# tests/test_history_io.py
+import json
+
+import history_io
+
+
+class FakeDatabase:
+    """
+    只记录 import_history_batch 写入的行，替代 DatabaseManager。
+    """
+
+    def __init__(self):
+        self.rows = []
+
+    def import_history_batch(self, records):
+        self.rows.extend(records)
+        return True
+
+
+def test_import_jsonl_skips_malformed_rows(tmp_path):
+    path = tmp_path / "history.jsonl"
+    records = [
+        {"created_at": "2024-01-01 10:00:00", "target_lang": "en", "original_text": "你好", "translated_text": "Hello"},
+        {"created_at": 20240101, "target_lang": "en", "original_text": "早上好", "translated_text": "Good morning"},
+        {"created_at": "2024-01-01 10:00:00", "target_lang": ["en"], "original_text": "晚安", "translated_text": "Night"},
+        {"created_at": "2024-01-01 10:00:00", "target_lang": "en", "original_text": {"a": 1}, "translated_text": 2},
+        {"created_at": None, "target_lang": "日语", "original_text": "谢谢", "translated_text": "ありがとう"},
+    ]
+    path.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in records) + "\n{not json\n",
+                    encoding="utf-8")
+
+    db = FakeDatabase()
+    stats = history_io.import_history(db, 7, str(path), batch_size=1)
+
+    assert stats['rows'] == 2
+    assert stats['skipped'] == 4
+    assert stats['failed'] == 0
+    assert db.rows == [(7, "你好", "Hello", "en", "2024-01-01 10:00:00"), (7, "谢谢", "ありがとう", "ja", None)]
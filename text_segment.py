@@ -0,0 +1,129 @@
+# text_segment.py
+import re
+
+# 句末标点（中英文），切分后标点保留在句子末尾
+SENTENCE_END_PATTERN = re.compile(r'(?<=[。！？；!?;…])|(?<=\.)(?=\s)')
+
+
+def split_sentences(text, max_chars):
+    """
+    将单行文本切分为不超过 max_chars 的片段：优先在句末标点处切分，仍超长的句子再按逗号、空格，最后按字符硬切分。
+    :param text: 单行文本
+    :param max_chars: 单个片段的最大字符数
+    :return: 片段列表，按顺序拼接后与原文完全一致
+    """
+    if len(text) <= max_chars:
+        return [text]
+    pieces = []
+    for sentence in (s for s in SENTENCE_END_PATTERN.split(text) if s):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        # 句子本身过长：依次尝试在逗号、空白处切分
+        for clause in (c for c in re.split(r'(?<=[，,、])|(?<=\s)', sentence) if c):
+            while len(clause) > max_chars:
+                pieces.append(clause[:max_chars])
+                clause = clause[max_chars:]
+            pieces.append(clause)
+    return merge_small(pieces, max_chars)
+
+
+def merge_small(pieces, max_chars):
+    """
+    将相邻的短片段重新合并，尽量减少片段数量，同时保证每段不超过 max_chars。
+    """
+    merged = []
+    for piece in pieces:
+        if merged and len(merged[-1]) + len(piece) <= max_chars:
+            merged[-1] += piece
+        else:
+            merged.append(piece)
+    return merged
+
+
+def segment_text(text, max_chars, by_sentence=False):
+    """
+    按行（可选再按句）切分文本，并记录还原版式所需的结构。
+    :param text: 原文（如 OCR 输出的多行文本）
+    :param max_chars: 单个片段的最大字符数
+    :param by_sentence: 为 True 时每个句子单独成段，否则仅对超长行按句切分
+    :return: 二维列表，外层对应每一行，内层为该行的片段，可用 rebuild_text 还原
+    """
+    layout = []
+    for line in text.split("\n"):
+        if by_sentence:
+            pieces = [s for s in SENTENCE_END_PATTERN.split(line) if s]
+            pieces = [p for s in pieces for p in split_sentences(s, max_chars)] or [line]
+        else:
+            pieces = split_sentences(line, max_chars)
+        layout.append(pieces)
+    return layout
+
+
+def translatable(segment):
+    """
+    判断片段是否需要翻译（纯空白或纯数字/标点的片段原样保留）。
+    """
+    return bool(re.search(r'[^\W\d_]', segment))
+
+
+def unique_segments(layout):
+    """
+    提取需要翻译的去重片段（保持首次出现的顺序），重复行只翻译一次。
+    :return: 去重后的片段列表（已去除首尾空白）
+    """
+    seen = {}
+    for pieces in layout:
+        for piece in pieces:
+            key = piece.strip()
+            if translatable(key) and key not in seen:
+                seen[key] = None
+    return list(seen)
+
+
+def pack_batches(segments, max_chars, max_items):
+    """
+    将片段打包为批量请求，每批的总字符数不超过 max_chars、片段数不超过 max_items。
+    :return: 批次列表，每个批次为片段列表
+    """
+    batches, current, size = [], [], 0
+    for segment in segments:
+        if current and (size + len(segment) > max_chars or len(current) >= max_items):
+            batches.append(current)
+            current, size = [], 0
+        current.append(segment)
+        size += len(segment)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def rebuild_text(layout, translations, separator=""):
+    """
+    按原始版式将译文拼回：保留每个片段的首尾空白和原有换行，未翻译的片段原样输出。
+    :param layout: segment_text 返回的版式结构
+    :param translations: {去除首尾空白的原文片段: 译文} 映射
+    :param separator: 同一行相邻片段之间都没有空白时插入的分隔符（如译为英文时的空格）
+    :return: 还原版式后的完整译文
+    """
+    lines = []
+    for pieces in layout:
+        out = []
+        for piece in pieces:
+            key = piece.strip()
+            if key in translations:
+                lead = piece[:len(piece) - len(piece.lstrip())]
+                trail = piece[len(piece.rstrip()):]
+                piece = f"{lead}{translations[key]}{trail}"
+            if separator and out and piece[:1].strip() and out[-1][-1:].strip():
+                out.append(separator)
+            out.append(piece)
+        lines.append("".join(out))
+    return "\n".join(lines)
+
+
+def word_separator(lang):
+    """
+    :return: 目标语言中句子之间的分隔符：中文、日文不需要空格，其余语言使用空格
+    """
+    return "" if lang in ("zh", "ja") else " "
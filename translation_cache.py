@@ -0,0 +1,168 @@
+# translation_cache.py
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from config import TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL
+
+
+class LRUCache:
+    """
+    线程安全的进程内 LRU 缓存：按条目数量上限和存活时间 (TTL) 淘汰。
+    """
+
+    def __init__(self, max_size=1000, ttl=None):
+        """
+        :param max_size: 最大条目数，超出时淘汰最久未使用的条目
+        :param ttl: 条目存活时间（秒），为 None 时永不过期
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        读取缓存值，命中时将条目移到最近使用位置。
+        :return: 缓存值，未命中或已过期返回 None。
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """
+        写入缓存值，超出容量时淘汰最久未使用的条目。
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """
+        :return: 包含 size、hits、misses、evictions 的字典
+        """
+        with self._lock:
+            return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+class TranslationCache:
+    """
+    两级翻译缓存：第一级为进程内 LRU，第二级为可选的持久化存储（如 DatabaseManager 中的 translation_cache 表），
+    重启后或多个客户端之间仍可复用翻译结果。
+    缓存键为“规范化原文 + 源语言 + 目标语言”的 SHA-256 哈希。
+    """
+
+    # 错误提示字符串的前缀，这类结果绝不写入缓存
+    ERROR_PREFIXES = ("Translate Error:",)
+
+    def __init__(self, store=None, max_size=TRANSLATION_CACHE_SIZE, ttl=TRANSLATION_CACHE_TTL):
+        """
+        :param store: 持久化存储对象，需提供 get_cached_translation(key) 和
+                      save_cached_translation(key, source_lang, target_lang, translated) 方法；为 None 时仅使用内存缓存
+        :param max_size: 内存缓存最大条目数
+        :param ttl: 内存缓存条目存活时间（秒）
+        """
+        self.store = store
+        self.memory = LRUCache(max_size, ttl)
+        self._lock = threading.Lock()
+        self.store_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text):
+        """
+        规范化原文：Unicode NFC 归一化、去除首尾空白并合并行内连续空白，保留换行以区分段落结构。
+        """
+        text = unicodedata.normalize("NFC", text).strip()
+        return "\n".join(re.sub(r"[ \t　]+", " ", line).strip() for line in text.split("\n"))
+
+    @classmethod
+    def make_key(cls, text, source_lang, target_lang):
+        """
+        生成缓存键。
+        :return: 64 位十六进制 SHA-256 摘要
+        """
+        raw = f"{source_lang}\x00{target_lang}\x00{cls.normalize(text)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, text, source_lang, target_lang):
+        """
+        查询缓存：先查内存，再查持久化存储，存储命中时回填内存。
+        :return: 缓存的译文，未命中返回 None。
+        """
+        key = self.make_key(text, source_lang, target_lang)
+        result = self.memory.get(key)
+        if result is not None:
+            return result
+        if self.store is not None:
+            try:
+                result = self.store.get_cached_translation(key)
+            except Exception as e:
+                # 持久化层故障时退化为仅内存缓存，不影响翻译流程
+                print(f"Translation Cache Store Error: {e}")
+                result = None
+            if result is not None:
+                self.memory.put(key, result)
+                with self._lock:
+                    self.store_hits += 1
+                return result
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, text, source_lang, target_lang, translated):
+        """
+        写入缓存（同时写入内存和持久化存储）。空结果和错误提示字符串会被忽略。
+        """
+        if not translated or translated.startswith(self.ERROR_PREFIXES):
+            return
+        key = self.make_key(text, source_lang, target_lang)
+        self.memory.put(key, translated)
+        if self.store is not None:
+            try:
+                self.store.save_cached_translation(key, source_lang, target_lang, translated)
+            except Exception as e:
+                print(f"Translation Cache Store Error: {e}")
+
+    def stats(self):
+        """
+        获取缓存命中统计。
+        :return: 包含内存命中、存储命中、未命中次数及命中率的字典
+        """
+        memory = self.memory.stats()
+        with self._lock:
+            store_hits, misses = self.store_hits, self.misses
+        total = memory['hits'] + store_hits + misses
+        return {
+            'memory_hits': memory['hits'],
+            'store_hits': store_hits,
+            'misses': misses,
+            'hit_rate': (memory['hits'] + store_hits) / total if total else 0.0,
+            'memory_size': memory['size'],
+            'memory_evictions': memory['evictions'],
+        }
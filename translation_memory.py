@@ -0,0 +1,207 @@
+# translation_memory.py
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+from config import TM_FUZZY_THRESHOLD, TM_MAX_ENTRIES, TM_MIN_FUZZY_CHARS, HISTORY_EXPORT_CHUNK
+from history_search import ngrams
+from metrics import metrics
+from text_segment import translatable
+from translation_cache import TranslationCache
+
+# 数字（含千分位和小数）；仅数字不同的原文视为同一句式
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+# 替换数字后的占位符
+NUMBER_PLACEHOLDER = "\x00"
+
+# 匹配结果：译文、相似度（0~1）、匹配到的记忆原文、匹配类型（'exact'、'number' 或 'fuzzy'）
+Match = namedtuple("Match", "translated score source kind")
+
+
+def mask_numbers(text):
+    return NUMBER_PATTERN.sub(NUMBER_PLACEHOLDER, text)
+
+
+def transfer_numbers(old_source, new_source, old_translated):
+    """
+    将记忆译文中的数字替换为新原文中对应位置的数字。
+    要求两段原文除数字外完全相同；若某个变化的数字在译文中找不到，或同一数字需要替换为不同的值，则无法安全替换。
+    :return: 替换后的译文，无法替换时返回 None
+    """
+    mapping = {}
+    for old, new in zip(NUMBER_PATTERN.findall(old_source), NUMBER_PATTERN.findall(new_source)):
+        if mapping.setdefault(old, new) != new:
+            return None
+    changed = {old for old, new in mapping.items() if old != new}
+    if not changed <= set(NUMBER_PATTERN.findall(old_translated)):
+        return None
+    return NUMBER_PATTERN.sub(lambda m: mapping.get(m.group(), m.group()), old_translated)
+
+
+class TranslationMemory:
+    """
+    翻译记忆：按目标语言保存“原文 -> 译文”对，调用翻译接口前先查找可复用的历史译文。
+    - 精确匹配：规范化后的原文相同，直接返回译文；
+    - 数字匹配：原文仅数字不同（如同一截图中某个数值变化），替换译文中对应的数字后返回；
+    - 模糊匹配：按去除数字后的字符二元组 Dice 系数打分，达到阈值时复用。
+    记忆从 history 表按记录 ID 增量加载（多行记录在行数一致时同时按行拆分为片段），新译文在接口返回后即时加入；
+    每种目标语言按 LRU 保留有限条目。
+    """
+
+    def __init__(self, max_entries=TM_MAX_ENTRIES, fuzzy_threshold=TM_FUZZY_THRESHOLD,
+                 min_fuzzy_chars=TM_MIN_FUZZY_CHARS):
+        """
+        :param max_entries: 每种目标语言保留的最大条目数
+        :param fuzzy_threshold: 模糊匹配直接复用的最低相似度，1.0 表示只复用精确匹配和数字匹配
+        :param min_fuzzy_chars: 参与模糊匹配的最短原文长度，过短的文本相似度没有参考价值
+        """
+        self.max_entries = max_entries
+        self.fuzzy_threshold = fuzzy_threshold
+        self.min_fuzzy_chars = min_fuzzy_chars
+        self._entries = {}  # 目标语言 -> OrderedDict(规范化原文 -> (译文, 二元组集合))
+        self._masked = {}  # 目标语言 -> {去除数字的原文: 规范化原文}
+        self._postings = {}  # 目标语言 -> {二元组: set(规范化原文)}
+        self._lock = threading.Lock()
+        self.user_id = None
+        self._last_history_id = 0
+        self.hits = {'exact': 0, 'number': 0, 'fuzzy': 0}
+        self.misses = 0
+        self.chars_avoided = 0
+
+    def add(self, source, translated, target_lang):
+        """
+        加入（或刷新）一条记忆。空文本、错误提示和无需翻译的文本会被忽略。
+        """
+        if not source or not translated or translated.startswith(TranslationCache.ERROR_PREFIXES): return
+        source = TranslationCache.normalize(source)
+        if not translatable(source): return
+        masked = mask_numbers(source)
+        grams = ngrams(masked)
+        with self._lock:
+            entries = self._entries.setdefault(target_lang, OrderedDict())
+            postings = self._postings.setdefault(target_lang, {})
+            if source in entries:
+                entries.move_to_end(source)
+            else:
+                for gram in grams:
+                    postings.setdefault(gram, set()).add(source)
+            entries[source] = (translated, grams)
+            self._masked.setdefault(target_lang, {})[masked] = source
+            while len(entries) > self.max_entries:
+                self._evict(target_lang, *entries.popitem(last=False))
+
+    def _evict(self, target_lang, source, entry):
+        postings = self._postings[target_lang]
+        for gram in entry[1]:
+            sources = postings.get(gram)
+            if sources is None: continue
+            sources.discard(source)
+            if not sources: del postings[gram]
+        masked = self._masked[target_lang]
+        key = mask_numbers(source)
+        if masked.get(key) == source: del masked[key]
+
+    def lookup(self, text, target_lang, min_score=None):
+        """
+        查找最相似的记忆（只读，不计入命中统计），可用于向用户提示候选译文。
+        :param min_score: 模糊匹配的最低相似度，默认使用 fuzzy_threshold
+        :return: Match，没有达到阈值的记忆时返回 None
+        """
+        min_score = self.fuzzy_threshold if min_score is None else min_score
+        source = TranslationCache.normalize(text)
+        masked = mask_numbers(source)
+        with self._lock:
+            entries = self._entries.get(target_lang)
+            if not entries: return None
+            entry = entries.get(source)
+            if entry is not None:
+                entries.move_to_end(source)
+                return Match(entry[0], 1.0, source, 'exact')
+            matched = self._masked[target_lang].get(masked)
+            if matched is not None and matched != source:
+                translated = transfer_numbers(matched, source, entries[matched][0])
+                if translated is not None:
+                    return Match(translated, 1.0, matched, 'number')
+            if min_score >= 1.0 or len(source) < self.min_fuzzy_chars: return None
+            # 通过倒排表统计与各条目共有的二元组数，即可得到 Dice 系数
+            grams = ngrams(masked)
+            postings = self._postings[target_lang]
+            overlap = {}
+            for gram in grams:
+                for candidate in postings.get(gram, ()):
+                    overlap[candidate] = overlap.get(candidate, 0) + 1
+            best, best_score = None, 0.0
+            for candidate, shared in overlap.items():
+                score = 2 * shared / (len(grams) + len(entries[candidate][1]))
+                if score > best_score:
+                    best, best_score = candidate, score
+            if best is None or best_score < min_score: return None
+            return Match(entries[best][0], best_score, best, 'fuzzy')
+
+    def reuse(self, text, target_lang):
+        """
+        翻译前调用：返回可直接使用的记忆译文，并更新命中统计。
+        :return: 译文，没有可复用的记忆时返回 None
+        """
+        match = self.lookup(text, target_lang)
+        with self._lock:
+            if match is None:
+                self.misses += 1
+                return None
+            self.hits[match.kind] += 1
+            self.chars_avoided += len(text)
+        metrics.add_payload('translation_memory', f'{match.kind}_chars', len(text))
+        return match.translated
+
+    def load_history(self, db, user_id, chunk_size=HISTORY_EXPORT_CHUNK):
+        """
+        从 history 表加载用户的历史译文。再次调用时只读取上次加载之后新增的记录；切换用户时先清空记忆。
+        :param db: DatabaseManager 实例
+        :return: 本次加载的记录数
+        """
+        if user_id != self.user_id:
+            self.clear()
+            self.user_id = user_id
+        rows = 0
+        for history_id, original, translated, lang, _ in db.iter_user_history(user_id, chunk_size,
+                                                                             self._last_history_id):
+            self._last_history_id = history_id
+            rows += 1
+            if not original or not translated: continue
+            self.add(original, translated, lang)
+            # 分段翻译保持原文的换行结构，行数一致时逐行加入，供分段翻译按片段复用
+            original_lines, translated_lines = original.split("\n"), translated.split("\n")
+            if len(original_lines) > 1 and len(original_lines) == len(translated_lines):
+                for source_line, translated_line in zip(original_lines, translated_lines):
+                    self.add(source_line.strip(), translated_line.strip(), lang)
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._masked.clear()
+            self._postings.clear()
+        self.user_id = None
+        self._last_history_id = 0
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+    def stats(self):
+        """
+        :return: 各类命中次数、未命中次数、命中率、未发往翻译接口的文本（片段）数与字符数、条目数
+        """
+        with self._lock:
+            hits = dict(self.hits)
+            served = sum(hits.values())
+            total = served + self.misses
+            return {
+                'exact_hits': hits['exact'],
+                'number_hits': hits['number'],
+                'fuzzy_hits': hits['fuzzy'],
+                'misses': self.misses,
+                'hit_rate': served / total if total else 0.0,
+                'translations_avoided': served,
+                'chars_avoided': self.chars_avoided,
+                'entries': sum(len(entries) for entries in self._entries.values()),
+            }
@@ -1,14 +1,21 @@
 # ui_app.py
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import threading
+import asyncio
+import io
+import os
+import queue
 import time
-from PIL import Image, ImageTk
-import pygame
 
-from database import DatabaseManager
 from tencent_ai import TencentAIService
-from config import LANG_MAP, VOICE_MAP
+from async_service import AsyncTencentAIService
+from translation_cache import TranslationCache, LRUCache
+from translation_memory import TranslationMemory
+from live_translate import LiveTranslator
+from metrics import metrics
+import history_io
+from config import LANG_MAP, LANG_NAMES, VOICE_MAP, UI_POLL_INTERVAL_MS, HISTORY_PAGE_SIZE, METRICS_EXPORT_PATH, \
+    PREVIEW_CACHE_SIZE
 
 
 class TranslationApp:
@@ -19,26 +26,73 @@ class TranslationApp:
 
     def __init__(self, root):
         """
-        初始化应用：设置主窗口、初始化数据库和 AI 服务实例。
+        初始化应用：设置主窗口、创建 AI 服务实例，并在后台连接数据库。
         :param root: Tkinter 的根窗口对象
         """
         self.root = root
         self.root.title("智能文字翻译助手")
         self.root.geometry("900x600")
 
-        # 初始化后端逻辑服务
-        self.db = DatabaseManager()
-        self.ai_service = TencentAIService()
+        # 初始化后端逻辑服务；数据库在后台线程中连接并检查表结构，登录界面无需等待 MySQL 即可显示
+        self.db = None
+        # 翻译缓存以数据库中的 translation_cache 表作为持久化层，数据库就绪后接入；
+        # 翻译记忆在登录后从当前用户的历史记录中加载
+        self.ai_service = TencentAIService(cache=TranslationCache(), memory=TranslationMemory())
+        # 所有界面请求统一提交到后台事件循环，结果经队列回到 Tk 主线程更新控件
+        self.async_ai = AsyncTencentAIService(self.ai_service)
+        self._ui_queue = queue.Queue()
+        self._drain_ui_queue()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.current_user_id = None  # 用于记录当前登录的用户 ID
 
+        # 增量翻译：开启后修改原文再翻译时只重新翻译改动过的句子
+        self.var_incremental = tk.BooleanVar(value=False)
+        self.last_segments = None  # 上一次增量翻译的 (目标语言代码, {原文片段: 译文})
+        # 实时翻译：开启后编辑原文时自动刷新译文（防抖 + 合并相同请求）
+        self.var_live = tk.BooleanVar(value=False)
+        self.live_translator = LiveTranslator(self.async_ai)
+        self._writing_source = False  # 程序正在写入原文框，此时的 <<Modified>> 不是用户编辑
+        # 语音预合成：开启后翻译完成即在后台合成语音，点击播放时直接使用
+        self.var_prefetch = tk.BooleanVar(value=False)
+        self.tts_prefetch = None  # 进行中或已完成的预合成 (译文, 音色 ID, Future)
+        self._audio_buffer = None  # 正在播放的音频数据，播放期间需保持引用
+        # 图片预览缩略图缓存：键为 (文件路径, 修改时间, 文件大小)，重新选择同一张图片时无需再次解码
+        self.preview_cache = LRUCache(PREVIEW_CACHE_SIZE)
+
         # TTS 频率限制相关变量
         self.last_tts_time = 0
         self.TTS_COOLDOWN = 1.5  # 冷却时间（秒），防止频繁点击
 
-        # 初始化音频混音器，用于播放合成的语音
-        pygame.mixer.init()
-        # 默认展示登录界面
+        # 默认展示登录界面（音频混音器推迟到首次播放时初始化）
         self.show_login_frame()
+        self._run_async('db_init', self.async_ai.run_blocking(self._create_database), self._on_database_ready)
+
+    def _create_database(self):
+        """
+        在后台线程中导入数据库驱动并创建 DatabaseManager（含连接池和表结构迁移检查），
+        同时预先加载语音缓存索引（需扫描缓存目录），首次播放时无需等待。
+        """
+        self.ai_service.audio_cache
+        from database import DatabaseManager
+        return DatabaseManager()
+
+    def _on_database_ready(self, db):
+        """
+        数据库就绪后接入翻译缓存的持久化层，并更新登录界面的状态提示。
+        """
+        self.db = db
+        self.ai_service.cache.store = db
+        if self.lbl_db_status.winfo_exists():
+            self.lbl_db_status.config(text="")
+
+    def _database_ready(self):
+        """
+        检查数据库是否已就绪，未就绪时提示用户稍候。
+        """
+        if self.db is None:
+            messagebox.showinfo("提示", "正在连接数据库，请稍候")
+            return False
+        return True
 
     def show_login_frame(self):
         """
@@ -66,23 +120,40 @@ class TranslationApp:
         tk.Button(btn_frame, text="登录", command=self.login).pack(side=tk.LEFT, padx=10)
         tk.Button(btn_frame, text="注册", command=self.register).pack(side=tk.LEFT, padx=10)
 
+        # 数据库连接状态提示
+        self.lbl_db_status = tk.Label(frame, text="" if self.db is not None else "正在连接数据库...", fg="gray")
+        self.lbl_db_status.pack()
+
     def login(self):
         """
         处理登录逻辑：验证用户信息并根据结果跳转界面。
         """
+        if not self._database_ready(): return
         username = self.entry_user.get()
         password = self.entry_pass.get()
         user_id = self.db.login_user(username, password)
         if user_id:
             self.current_user_id = user_id
+            # 在后台加载该用户的历史译文作为翻译记忆
+            self._run_async('memory_load', self.async_ai.run_blocking(
+                self.ai_service.memory.load_history, self.db, user_id))
             self.show_main_interface()
         else:
             messagebox.showerror("错误", "用户名或密码错误")
 
+    def logout(self):
+        """
+        退出登录：在后台写完当前用户尚未落库的历史记录，并返回登录界面。
+        """
+        self.current_user_id = None
+        self._run_async('history_flush', self.async_ai.run_blocking(self.db.flush_history))
+        self.show_login_frame()
+
     def register(self):
         """
         处理注册逻辑：调用数据库接口创建新用户。
         """
+        if not self._database_ready(): return
         username = self.entry_user.get()
         password = self.entry_pass.get()
         if self.db.register_user(username, password):
@@ -101,7 +172,7 @@ class TranslationApp:
         nav_frame.pack(fill=tk.X)
         tk.Button(nav_frame, text="翻译主页", command=self.show_main_interface).pack(side=tk.LEFT, padx=10, pady=5)
         tk.Button(nav_frame, text="历史记录", command=self.show_history_interface).pack(side=tk.LEFT, padx=10, pady=5)
-        tk.Button(nav_frame, text="退出登录", command=self.show_login_frame).pack(side=tk.RIGHT, padx=10, pady=5)
+        tk.Button(nav_frame, text="退出登录", command=self.logout).pack(side=tk.RIGHT, padx=10, pady=5)
 
         content_frame = tk.Frame(self.root)
         content_frame.pack(expand=True, fill=tk.BOTH, padx=20, pady=20)
@@ -124,6 +195,7 @@ class TranslationApp:
         tk.Label(right_frame, text="识别结果 / 待翻译文本:").pack(anchor="w")
         self.txt_source = tk.Text(right_frame, height=8)
         self.txt_source.pack(fill=tk.X, pady=5)
+        self.txt_source.bind("<<Modified>>", self.on_source_modified)
 
         # 语言选择与翻译按钮
         setting_frame = tk.Frame(right_frame)
@@ -132,12 +204,21 @@ class TranslationApp:
         self.combo_lang = ttk.Combobox(setting_frame, values=list(LANG_MAP.keys()), state="readonly")
         self.combo_lang.current(1)  # 默认选中英语
         self.combo_lang.pack(side=tk.LEFT, padx=5)
+        # 实时翻译时切换目标语言立即重新翻译
+        self.combo_lang.bind("<<ComboboxSelected>>", lambda event: self.on_source_modified())
         tk.Button(setting_frame, text="开始翻译 (MT)", command=self.perform_translation).pack(side=tk.LEFT, padx=10)
+        tk.Button(setting_frame, text="翻译为全部语言", command=self.perform_fanout_translation).pack(side=tk.LEFT)
+        tk.Checkbutton(setting_frame, text="增量翻译", variable=self.var_incremental).pack(side=tk.LEFT)
+        tk.Checkbutton(setting_frame, text="实时翻译", variable=self.var_live,
+                       command=self.on_source_modified).pack(side=tk.LEFT)
 
         # 翻译结果展示框
         tk.Label(right_frame, text="翻译结果:").pack(anchor="w")
         self.txt_target = tk.Text(right_frame, height=8)
         self.txt_target.pack(fill=tk.X, pady=5)
+        self.txt_target.bind("<<Modified>>", self.on_target_modified)
+        # 重新构建的译文框为空（如从历史记录界面返回），实时翻译需重新写入译文
+        self.live_translator.reset()
 
         # 语音合成与播放
         voice_frame = tk.Frame(right_frame)
@@ -146,7 +227,11 @@ class TranslationApp:
         self.combo_voice = ttk.Combobox(voice_frame, values=list(VOICE_MAP.keys()), state="readonly")
         self.combo_voice.current(0)
         self.combo_voice.pack(side=tk.LEFT, padx=5)
+        # 切换音色后按新音色重新预合成
+        self.combo_voice.bind("<<ComboboxSelected>>", lambda event: self.prefetch_tts())
         tk.Button(voice_frame, text="语音播放 (TTS)", command=self.perform_tts).pack(side=tk.LEFT, padx=10)
+        tk.Checkbutton(voice_frame, text="预合成语音", variable=self.var_prefetch,
+                       command=self.prefetch_tts).pack(side=tk.LEFT)
 
     def show_history_interface(self):
         """
@@ -157,6 +242,16 @@ class TranslationApp:
         nav_frame.pack(fill=tk.X)
         tk.Button(nav_frame, text="返回主页", command=self.show_main_interface).pack(side=tk.LEFT, padx=10, pady=5)
 
+        # 检索区域：按原文/译文全文检索，清空检索词即恢复完整列表
+        search_frame = tk.Frame(self.root)
+        search_frame.pack(fill=tk.X, padx=20, pady=(10, 0))
+        tk.Label(search_frame, text="搜索:").pack(side=tk.LEFT)
+        self.entry_search = tk.Entry(search_frame)
+        self.entry_search.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+        self.entry_search.bind("<Return>", lambda event: self.search_history())
+        tk.Button(search_frame, text="搜索", command=self.search_history).pack(side=tk.LEFT, padx=5)
+        tk.Button(search_frame, text="清除", command=self.clear_history_search).pack(side=tk.LEFT)
+
         list_frame = tk.Frame(self.root)
         list_frame.pack(expand=True, fill=tk.BOTH, padx=20, pady=20)
 
@@ -176,64 +271,230 @@ class TranslationApp:
 
         self.tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
 
-        # 添加滚动条
+        # 添加滚动条：滚动接近底部时自动加载下一页
         scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tree.configure(yscroll=scrollbar.set)
 
-        btn_del = tk.Button(self.root, text="删除选中记录", command=self.delete_selected_history)
-        btn_del.pack(pady=10)
+        def on_tree_scroll(first, last):
+            scrollbar.set(first, last)
+            if float(last) >= 0.9:
+                self.load_more_history()
+
+        self.tree.configure(yscroll=on_tree_scroll)
+        # 双击记录时再加载完整的原文和译文
+        self.tree.bind("<Double-1>", self.show_history_detail)
+
+        action_frame = tk.Frame(self.root)
+        action_frame.pack(pady=10)
+        tk.Button(action_frame, text="删除选中记录", command=self.delete_selected_history).pack(side=tk.LEFT, padx=5)
+        tk.Button(action_frame, text="导出历史", command=self.export_history).pack(side=tk.LEFT, padx=5)
+        tk.Button(action_frame, text="导入历史", command=self.import_history).pack(side=tk.LEFT, padx=5)
+        # 导出/导入进度
+        self.lbl_transfer = tk.Label(action_frame, text="", fg="gray")
+        self.lbl_transfer.pack(side=tk.LEFT, padx=5)
 
         # 加载数据库中的历史记录
+        self.history_query = ""
+        self.load_history()
+
+    def search_history(self):
+        """
+        按检索框中的关键词重新加载历史记录表格。
+        """
+        self.history_query = self.entry_search.get().strip()
         self.load_history()
 
+    def clear_history_search(self):
+        """
+        清空检索词并恢复完整的历史记录列表。
+        """
+        self.entry_search.delete(0, tk.END)
+        self.search_history()
+
     def upload_and_ocr(self):
         """
-        处理图片上传并调用 OCR 服务。使用多线程防止 UI 界面卡顿。
+        处理图片上传并调用 OCR 服务。识别在后台事件循环中执行，防止 UI 界面卡顿。
         """
-        file_path = filedialog.askopenfilename(filetypes=[("Image Files", "*.jpg *.png *.bmp")])
+        file_path = filedialog.askopenfilename(filetypes=[("Image Files", "*.jpg *.jpeg *.png *.bmp")])
         if file_path:
-            # 图片预览逻辑
-            load = Image.open(file_path)
-            load.thumbnail((300, 300))
-            render = ImageTk.PhotoImage(load)
-            self.lbl_image.config(image=render, text="")
-            self.lbl_image.image = render
-
-            # 定义异步 OCR 线程任务
-            def run_ocr():
-                self.txt_source.delete(1.0, tk.END)
-                self.txt_source.insert(tk.END, "正在识别中...")
-                text = self.ai_service.ocr_image(file_path)
-                self.txt_source.delete(1.0, tk.END)
-                self.txt_source.insert(tk.END, text)
-
-            threading.Thread(target=run_ocr).start()
+            self.lbl_image.config(image="", text="正在加载预览...")
+            self.lbl_image.image = None
+            self._set_source_text("正在识别中...")
+
+            # 图片读取与解码都在后台线程中完成，解码结果同时用于预览和 OCR 预处理
+            async def run_ocr():
+                thumbnail, raw, decoded = await self.async_ai.run_blocking(self._load_preview, file_path)
+                self._post(self._show_preview, thumbnail)
+                return await self.async_ai.ocr_image(file_path, raw, decoded)
+
+            # 新的识别请求会取消仍在进行中的旧请求
+            self._run_async('ocr', run_ocr(), self._on_ocr_result)
+
+    def _on_ocr_result(self, text):
+        """
+        显示识别结果（仅在主线程调用）。识别结果是新的原文，开启实时翻译时直接提交翻译；占位提示不会被翻译。
+        """
+        if not self.txt_source.winfo_exists(): return
+        self._set_source_text(text)
+        if self.var_live.get():
+            self.on_source_modified()
+
+    def _load_preview(self, file_path):
+        """
+        在后台线程中读取图片并生成预览缩略图；缩略图缓存未命中时才解码（JPEG 使用 draft 快速解码）。
+        :return: (缩略图或 None, 文件内容或 None, 解码结果或 None)；读取失败时文件内容为 None，由 OCR 报告错误
+        """
+        # Pillow 在首次上传图片时才导入
+        from image_utils import decode_image, make_thumbnail
+        try:
+            stat = os.stat(file_path)
+            with open(file_path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            print(f"Image Load Error: {e}")
+            return None, None, None
+        key = (file_path, stat.st_mtime_ns, stat.st_size)
+        thumbnail = self.preview_cache.get(key)
+        if thumbnail is not None:
+            return thumbnail, raw, None
+        try:
+            with metrics.timed('image.decode'):
+                decoded = decode_image(raw)
+        except Exception as e:
+            print(f"Image Decode Error: {e}")
+            return None, raw, None
+        thumbnail = make_thumbnail(decoded)
+        self.preview_cache.put(key, thumbnail)
+        return thumbnail, raw, decoded
+
+    def _show_preview(self, thumbnail):
+        """
+        在主线程中显示预览（Tk 的 PhotoImage 只能在主线程创建）。
+        """
+        if not self.lbl_image.winfo_exists(): return
+        if thumbnail is None:
+            self.lbl_image.config(image="", text="无法预览该图片")
+            return
+        from PIL import ImageTk
+        render = ImageTk.PhotoImage(thumbnail)
+        self.lbl_image.config(image=render, text="")
+        self.lbl_image.image = render
 
     def perform_translation(self):
         """
-        执行文字翻译并保存至历史记录。使用多线程处理网络请求。
+        执行文字翻译并保存至历史记录。网络请求在后台事件循环中执行。
+        开启增量翻译时，与上一次翻译的原文按句比对，只翻译改动过的句子。
         """
         text = self.txt_source.get(1.0, tk.END).strip()
         if not text: return
         target_lang_name = self.combo_lang.get()
         target_code = LANG_MAP.get(target_lang_name, 'en')
+        self._set_text(self.txt_target, "正在翻译...")
+        # 译文框改由手动翻译写入，停止等待中的实时翻译
+        self.live_translator.cancel()
+        user_id = self.current_user_id
+        incremental = self.var_incremental.get()
+        previous = None
+        if incremental and self.last_segments and self.last_segments[0] == target_code:
+            previous = self.last_segments[1]
+
+        # 定义异步翻译任务
+        async def run_trans():
+            if incremental:
+                result, segments = await self.async_ai.translate_incremental(text, target_code, previous)
+                if segments is not None:
+                    self.last_segments = (target_code, segments)
+            else:
+                # 多行/长文本自动分段并发翻译，单行短文本内部直接调用 translate_text
+                result = await self.async_ai.translate_segmented(text, target_code)
+            self._post(self._set_text, self.txt_target, result)
+            self._post(self.prefetch_tts, result)
+            # 翻译完成后存入历史记录写后队列，由后台线程批量写入数据库
+            self.db.enqueue_history(user_id, text, result, target_code)
+
+        self._run_async('translate', run_trans())
+
+    def perform_fanout_translation(self):
+        """
+        将原文翻译为 LANG_MAP 中的全部语言：只识别一次源语言，各语言并发翻译，每完成一种就刷新结果框，
+        全部完成后一次批量写入历史记录（与识别出的源语言相同的目标语言不写入）。
+        """
+        text = self.txt_source.get(1.0, tk.END).strip()
+        if not text: return
+        self._set_text(self.txt_target, "正在翻译为全部语言...")
+        self.live_translator.cancel()
+        user_id = self.current_user_id
+        targets = list(LANG_MAP.values())
+
+        async def run_fanout():
+            # 先识别源语言再交给 translate_fanout，写入历史时据此排除原文所在的语言
+            source = await self.async_ai.detect_language(text)
+            results = {}
+            async for code, result in self.async_ai.translate_fanout(text, targets, source):
+                results[code] = result
+                # 按语言列表顺序展示已完成的译文
+                display = "\n\n".join(f"【{LANG_NAMES[c]}】\n{results[c]}" for c in targets if c in results)
+                self._post(self._set_text, self.txt_target, display)
+            records = [(user_id, text, result, code) for code, result in results.items()
+                       if code != source and not result.startswith("Translate Error:")]
+            await self.async_ai.run_blocking(self.db.add_history_batch, records)
+
+        self._run_async('translate', run_fanout())
+
+    def on_source_modified(self, event=None):
+        """
+        原文被编辑（或勾选实时翻译）时调用：开启实时翻译时交给 LiveTranslator 防抖后翻译，结果不写入历史记录。
+        """
+        if event is not None:
+            # <<Modified>> 只在修改标志由假变真时触发一次，需要复位才能收到下一次编辑
+            if not self.txt_source.edit_modified(): return
+            self.txt_source.edit_modified(False)
+            if self._writing_source: return
+        else:
+            # 勾选实时翻译或切换目标语言：译文框可能已被其他操作改写，需重新翻译
+            self.live_translator.reset()
+        if not self.var_live.get():
+            self.live_translator.cancel()
+            return
+        text = self.txt_source.get(1.0, tk.END).strip()
+        if not text: return
+        target_code = LANG_MAP.get(self.combo_lang.get(), 'en')
+        self.live_translator.edit(text, target_code, lambda result: self._post(self._set_text, self.txt_target, result))
 
-        # 定义异步翻译线程任务
-        def run_trans():
-            self.txt_target.delete(1.0, tk.END)
-            self.txt_target.insert(tk.END, "正在翻译...")
-            result = self.ai_service.translate_text(text, target_code)
-            self.txt_target.delete(1.0, tk.END)
-            self.txt_target.insert(tk.END, result)
-            # 翻译完成后自动存入数据库
-            self.db.add_history(self.current_user_id, text, result, target_lang_name)
+    def prefetch_tts(self, text=None):
+        """
+        开启语音预合成时，在后台为当前译文和所选音色合成语音（仅在主线程调用）。
+        同一时间只保留一个预合成任务，新的预合成会取消旧的。
+        :param text: 待合成的译文，默认取结果框中的内容
+        """
+        self.cancel_tts_prefetch()
+        if not self.var_prefetch.get(): return
+        text = (self.txt_target.get(1.0, tk.END) if text is None else text).strip()
+        if not text or text.startswith("Translate Error:"): return
+        voice_id = VOICE_MAP.get(self.combo_voice.get(), 101001)
 
-        threading.Thread(target=run_trans).start()
+        async def run_prefetch():
+            return [data async for data in self.async_ai.text_to_speech_chunks(text, voice_id, as_bytes=True)]
+
+        self.tts_prefetch = (text, voice_id, self.async_ai.submit('tts_prefetch', run_prefetch()))
+
+    def cancel_tts_prefetch(self):
+        if self.tts_prefetch is not None:
+            self.async_ai.cancel('tts_prefetch')
+            self.tts_prefetch = None
+
+    def on_target_modified(self, event=None):
+        """
+        结果框内容变化时，若已不是预合成所用的译文，则取消预合成。
+        """
+        if not self.txt_target.edit_modified(): return
+        self.txt_target.edit_modified(False)
+        if self.tts_prefetch is not None and self.txt_target.get(1.0, tk.END).strip() != self.tts_prefetch[0]:
+            self.cancel_tts_prefetch()
 
     def perform_tts(self):
         """
-        执行语音合成并播放。使用多线程避免音频加载时阻塞界面。
+        执行语音合成并播放。合成与播放调度在后台事件循环中执行，避免阻塞界面。
         """
         text = self.txt_target.get(1.0, tk.END).strip()
         if not text: return
@@ -246,43 +507,300 @@ class TranslationApp:
             return
 
         self.last_tts_time = current_time
+        clicked_at = time.perf_counter()
         voice_id = VOICE_MAP.get(self.combo_voice.get(), 101001)
-
-        # 定义异步 TTS 线程任务
-        def run_tts():
-            # 尝试停止当前正在播放的音频，释放资源
-            if pygame.mixer.music.get_busy():
-                pygame.mixer.music.stop()
-            file_path = self.ai_service.text_to_speech(text, voice_id)
-            if file_path:
+        music = self._get_player()
+        # 预合成的译文和音色与当前一致时直接使用（进行中则等待其完成）
+        prefetched = None
+        if self.tts_prefetch is not None and self.tts_prefetch[:2] == (text, voice_id):
+            prefetched = self.tts_prefetch[2]
+
+        async def audio_chunks():
+            if prefetched is not None:
                 try:
-                    pygame.mixer.music.load(file_path)
-                    pygame.mixer.music.play()
+                    # shield：播放被新请求打断时不取消预合成，之后再次播放仍可使用
+                    chunks = await asyncio.shield(asyncio.wrap_future(prefetched))
+                except asyncio.CancelledError:
+                    if not prefetched.cancelled(): raise
+                    chunks = None
                 except Exception as e:
-                    print(f"Pygame Play Error: {e}")
-
-        threading.Thread(target=run_tts).start()
+                    print(f"TTS Prefetch Error: {e}")
+                    chunks = None
+                if chunks is not None:
+                    metrics.add_payload('audio.prefetch', 'hits', 1)
+                    for data in chunks:
+                        yield data
+                    return
+            stream = self.async_ai.text_to_speech_chunks(text, voice_id, as_bytes=True)
+            try:
+                async for data in stream:
+                    yield data
+            finally:
+                await stream.aclose()
+
+        # 定义异步 TTS 任务：分片并发合成，第一段就绪即开始播放，其余分片依次衔接
+        # 新的播放请求会取消本任务，未开始合成的分片随之取消
+        async def run_tts():
+            # 尝试停止当前正在播放的音频，释放资源
+            if music.get_busy():
+                music.stop()
+            chunks = audio_chunks()
+            first = True
+            try:
+                async for data in chunks:
+                    if not data: continue
+                    # 等待上一分片播放结束
+                    while music.get_busy():
+                        await asyncio.sleep(0.05)
+                    try:
+                        # 直接从内存加载音频，无需写入临时文件再读盘
+                        self._audio_buffer = io.BytesIO(data)
+                        with metrics.timed('audio.load'):
+                            music.load(self._audio_buffer, "mp3")
+                        with metrics.timed('audio.play'):
+                            music.play()
+                        if first:
+                            # 从点击到开始发声的耗时
+                            metrics.observe('audio.click_to_sound', time.perf_counter() - clicked_at)
+                            first = False
+                    except Exception as e:
+                        print(f"Pygame Play Error: {e}")
+            finally:
+                await chunks.aclose()
+
+        self._run_async('tts', run_tts())
+
+    def _get_player(self):
+        """
+        首次播放时才导入 pygame 并初始化音频混音器，不拖慢程序启动。
+        :return: pygame.mixer.music 播放器
+        """
+        import pygame
+        if not pygame.mixer.get_init():
+            with metrics.timed('audio.mixer_init'):
+                pygame.mixer.init()
+        return pygame.mixer.music
 
     def load_history(self):
         """
-        从数据库读取当前用户的历史记录并填充到 Treeview 表格中。
+        重置历史记录表格并加载第一页数据（后续页在滚动时按需加载）。
         """
-        records = self.db.get_user_history(self.current_user_id)
         # 清空当前表格内容
         for item in self.tree.get_children(): self.tree.delete(item)
-        # 插入新记录
-        for r in records: self.tree.insert("", "end", values=r)
+        # 分页状态：代数用于丢弃切换界面后才返回的过期结果
+        self.history_generation = getattr(self, 'history_generation', 0) + 1
+        self.history_cursor = None
+        self.history_has_more = True
+        self.history_loading = False
+        self.load_more_history()
+
+    def load_more_history(self):
+        """
+        在后台事件循环中按游标加载下一页历史记录，完成后回到主线程追加到 Treeview。
+        检索模式下游标为结果偏移量。
+        """
+        if self.history_loading or not self.history_has_more: return
+        self.history_loading = True
+        generation = self.history_generation
+        cursor = self.history_cursor
+        query = self.history_query
+        user_id = self.current_user_id
+
+        async def run_load():
+            if cursor is None:
+                # 加载首页前先写入写后队列中的记录，保证刚翻译的内容能够显示
+                await self.async_ai.run_blocking(self.db.flush_history, 5)
+            if not query:
+                return await self.async_ai.run_blocking(self.db.get_user_history_page, user_id, cursor)
+            offset = cursor or 0
+            records = await self.async_ai.run_blocking(self.db.search_history, user_id, query,
+                                                       HISTORY_PAGE_SIZE, offset)
+            return records, (offset + len(records) if len(records) == HISTORY_PAGE_SIZE else None)
+
+        self._run_async('history_page', run_load(), lambda page: self._append_history_page(generation, *page),
+                        lambda error: self._on_history_page_error(generation))
+
+    def _append_history_page(self, generation, records, next_cursor):
+        """
+        将一页历史记录插入表格（仅在主线程调用）。
+        """
+        if generation != self.history_generation or not self.tree.winfo_exists(): return
+        # 数据库中存储语言代码，显示时转换为语言名称
+        for r in records: self.tree.insert("", "end", values=(*r[:3], LANG_NAMES.get(r[3], r[3]), *r[4:]))
+        self.history_cursor = next_cursor
+        self.history_has_more = next_cursor is not None
+        self.history_loading = False
+
+    def _on_history_page_error(self, generation):
+        """
+        加载某一页失败时恢复加载状态（仅在主线程调用），再次滚动到底部即可重试。
+        """
+        if generation == self.history_generation:
+            self.history_loading = False
+
+    def show_history_detail(self, event):
+        """
+        双击历史记录时在后台读取完整的原文和译文，并在新窗口中展示。
+        """
+        item = self.tree.identify_row(event.y)
+        if not item: return
+        history_id = self.tree.item(item)['values'][0]
+
+        self._run_async('history_detail',
+                        self.async_ai.run_blocking(self.db.get_history_detail, self.current_user_id, history_id),
+                        lambda record: record and self._open_history_detail(record))
+
+    def _open_history_detail(self, record):
+        """
+        构建历史记录详情窗口（仅在主线程调用）。
+        """
+        _, original, translated, lang, created_at = record
+        window = tk.Toplevel(self.root)
+        window.title(f"历史记录详情 - {LANG_NAMES.get(lang, lang)} - {created_at}")
+        tk.Label(window, text="原文:").pack(anchor="w", padx=10)
+        txt_original = tk.Text(window, height=10)
+        txt_original.insert(tk.END, original)
+        txt_original.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        tk.Label(window, text="译文:").pack(anchor="w", padx=10)
+        txt_translated = tk.Text(window, height=10)
+        txt_translated.insert(tk.END, translated)
+        txt_translated.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
 
     def delete_selected_history(self):
         """
-        删除表格中选中的历史记录，并同步更新数据库。
+        删除表格中选中的历史记录，并在后台以一条批量语句同步删除数据库记录。
         """
         selected = self.tree.selection()
         if not selected: return
-        for item in selected:
-            # values[0] 对应的是数据库中的记录 ID
-            self.db.delete_history(self.tree.item(item)['values'][0])
-            self.tree.delete(item)
+        # values[0] 对应的是数据库中的记录 ID
+        history_ids = [self.tree.item(item)['values'][0] for item in selected]
+        self.tree.delete(*selected)
+        # 删除操作不能被后续请求取消，每次使用独立的任务标识
+        self._run_async(object(),
+                        self.async_ai.run_blocking(self.db.delete_history_bulk, self.current_user_id, history_ids))
+
+    def export_history(self):
+        """
+        将当前用户的全部历史记录在后台流式导出到 CSV 或 JSONL 文件，并在界面上显示进度。
+        """
+        file_path = filedialog.asksaveasfilename(defaultextension=".csv",
+                                                 filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+        if not file_path: return
+        self._transfer_history("导出", history_io.export_history, file_path)
+
+    def import_history(self):
+        """
+        在后台从 CSV 或 JSONL 文件流式导入历史记录到当前用户，完成后刷新列表。
+        """
+        file_path = filedialog.askopenfilename(filetypes=[("History Files", "*.csv *.jsonl")])
+        if not file_path: return
+        self._transfer_history("导入", history_io.import_history, file_path, self.load_history)
+
+    def _transfer_history(self, action, func, file_path, on_done=None):
+        """
+        在线程池中执行导出/导入，进度经 _post 回到主线程更新标签。
+        :param action: 显示在进度标签上的操作名
+        :param func: history_io.export_history 或 history_io.import_history
+        :param on_done: 完成后在主线程中调用的函数
+        """
+        label = self.lbl_transfer
+
+        def show(text):
+            if label.winfo_exists(): label.config(text=text)
+
+        def task():
+            try:
+                stats = func(self.db, self.current_user_id, file_path,
+                             progress=lambda rows: self._post(show, f"已{action} {rows} 条..."))
+            except Exception as e:
+                # 文件读写、编码、CSV 解析或数据库错误都要在界面上给出最终状态
+                print(f"History {action} Error: {e}")
+                return f"{action}失败: {e}"
+            skipped = stats.get('skipped', 0) + stats.get('failed', 0)
+            return f"已{action} {stats['rows']} 条" + (f"，跳过 {skipped} 条" if skipped else "")
+
+        def finish(text):
+            show(text)
+            if on_done is not None and label.winfo_exists(): on_done()
+
+        show(f"正在{action}...")
+        # 导出/导入不能被后续请求取消，每次使用独立的任务标识
+        self._run_async(object(), self.async_ai.run_blocking(task), finish,
+                        lambda error: show(f"{action}失败: {error}"))
+
+    def _post(self, func, *args):
+        """
+        从任意线程投递一个界面更新操作，由 Tk 主线程依次执行（Tk 控件不是线程安全的）。
+        """
+        self._ui_queue.put((func, args))
+
+    def _drain_ui_queue(self):
+        """
+        在 Tk 主线程中执行所有待处理的界面更新，并通过 root.after 定时轮询。
+        """
+        while True:
+            try:
+                func, args = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except tk.TclError as e:
+                # 控件可能已随界面切换被销毁
+                print(f"UI Update Skipped: {e}")
+        self.root.after(UI_POLL_INTERVAL_MS, self._drain_ui_queue)
+
+    def _run_async(self, key, coro, on_result=None, on_error=None):
+        """
+        提交异步任务：同一 key 的旧任务会被取消，结果通过 _post 回到主线程交给 on_result 处理。
+        :param key: 任务标识，通常对应结果要写入的控件
+        :param coro: 协程对象
+        :param on_result: 可选的结果处理函数，在 Tk 主线程中调用
+        :param on_error: 可选的异常处理函数 on_error(异常)，在 Tk 主线程中调用
+        """
+        def callback(result, error):
+            if error is not None:
+                print(f"Async Task Error ({key}): {error}")
+                if on_error is not None:
+                    self._post(on_error, error)
+            elif on_result is not None:
+                self._post(on_result, result)
+
+        return self.async_ai.submit(key, coro, callback)
+
+    def _set_text(self, widget, text):
+        """
+        替换文本框内容（仅在主线程调用），控件已销毁时忽略。
+        """
+        if not widget.winfo_exists(): return
+        widget.delete(1.0, tk.END)
+        widget.insert(tk.END, text)
+
+    def _set_source_text(self, text):
+        """
+        替换原文框内容（仅在主线程调用）。程序写入不算作用户编辑：写入后复位修改标志，不会触发实时翻译。
+        """
+        if not self.txt_source.winfo_exists(): return
+        self._writing_source = True
+        try:
+            self._set_text(self.txt_source, text)
+            self.txt_source.edit_modified(False)
+        finally:
+            self._writing_source = False
+
+    def on_close(self):
+        """
+        关闭窗口：停止后台事件循环、归还数据库连接、保存缓存索引，并按配置导出性能指标。
+        """
+        if self.live_translator.edits:
+            print(f"Live Translate: {self.live_translator.stats()}")
+        self.async_ai.shutdown()
+        self.ai_service.close()
+        if self.db is not None:
+            self.db.close()
+        if METRICS_EXPORT_PATH:
+            metrics.export(METRICS_EXPORT_PATH)
+        self.root.destroy()
 
     def clear_frame(self):
         """